@@ -2,26 +2,48 @@ import asyncio
 import hashlib
 import logging
 import platform
+import random
 import shutil
+import signal
 import socket
 import subprocess
 import time
 import uuid
+from contextlib import suppress
 from dataclasses import asdict
+from functools import lru_cache
 from pathlib import Path
 
 import httpx
+import orjson
 import psutil
 from dotenv import load_dotenv
 
 from agent_service.logging_config import configure_logging
 from agent_service.settings import Settings
 
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
+
 load_dotenv()
 settings = Settings.from_env()
+_SETTINGS_DICT = asdict(settings)
 configure_logging(settings.log_level)
 logger = logging.getLogger("agent")
 
+_CPU_CORES = psutil.cpu_count(logical=False)
+_CPU_THREADS = psutil.cpu_count(logical=True)
+_GB = 1.0 / (1024**3)
+_GPU_TASK_TYPES = ("INFERENCE", "EMBEDDINGS", "INDEX", "TOKENIZE", "PREPROCESS")
+_CPU_TASK_TYPES = ("EMBEDDINGS", "INDEX", "TOKENIZE", "PREPROCESS")
+_JSON_HEADERS = {"Content-Type": "application/json"}
+_HTTP_TIMEOUT = httpx.Timeout(10.0, connect=3.0)
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=8, max_connections=16)
+
+shutdown_event = asyncio.Event()
+
 
 def load_or_create_node_id(path: Path) -> str:
     path.parent.mkdir(parents=True, exist_ok=True)
@@ -35,6 +57,7 @@ def load_or_create_node_id(path: Path) -> str:
     return node_id
 
 
+@lru_cache(maxsize=1)
 def detect_ip() -> str:
     with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
         try:
@@ -66,14 +89,39 @@ def _run_nvidia_query(fields: str) -> list[str] | None:
     except (OSError, subprocess.CalledProcessError):
         return None
 
-    rows = [line.strip() for line in result.stdout.strip().splitlines() if line.strip()]
-    if not rows:
+    # Callers query two fields of the first GPU; split from the right so a comma
+    # inside the GPU name stays in the first cell.
+    first_line = result.stdout.lstrip().partition("\n")[0]
+    if not first_line:
+        return None
+
+    return [cell.strip() for cell in first_line.rsplit(",", maxsplit=1)]
+
+
+@lru_cache(maxsize=1)
+def _nvml_handle() -> object | None:
+    if pynvml is None:
         return None
 
-    return [item.strip() for item in rows[0].split(",")]
+    try:
+        pynvml.nvmlInit()
+        return pynvml.nvmlDeviceGetHandleByIndex(0)
+    except pynvml.NVMLError:
+        return None
 
 
 def detect_gpu_capabilities() -> tuple[str | None, float | None]:
+    handle = _nvml_handle()
+    if handle is not None:
+        try:
+            name = pynvml.nvmlDeviceGetName(handle)
+            memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
+        except pynvml.NVMLError:
+            return (None, None)
+        if isinstance(name, bytes):
+            name = name.decode("utf-8", errors="replace")
+        return (name or None, round(memory.total * _GB, 3))
+
     row = _run_nvidia_query("name,memory.total")
     if row is None or len(row) < 2:
         return (None, None)
@@ -88,6 +136,15 @@ def detect_gpu_capabilities() -> tuple[str | None, float | None]:
 
 
 def detect_gpu_metrics() -> tuple[float | None, float | None]:
+    handle = _nvml_handle()
+    if handle is not None:
+        try:
+            utilization = pynvml.nvmlDeviceGetUtilizationRates(handle)
+            memory = pynvml.nvmlDeviceGetMemoryInfo(handle)
+        except pynvml.NVMLError:
+            return (None, None)
+        return (float(utilization.gpu), round(memory.used * _GB, 3))
+
     row = _run_nvidia_query("utilization.gpu,memory.used")
     if row is None or len(row) < 2:
         return (None, None)
@@ -105,15 +162,14 @@ def detect_gpu_metrics() -> tuple[float | None, float | None]:
     return (gpu_percent, vram_used_gb)
 
 
+@lru_cache(maxsize=1)
 def detect_capabilities() -> dict[str, object]:
-    cpu_cores = psutil.cpu_count(logical=False)
-    cpu_threads = psutil.cpu_count(logical=True)
-    ram_total_gb = round(psutil.virtual_memory().total / (1024**3), 3)
+    ram_total_gb = round(psutil.virtual_memory().total * _GB, 3)
     gpu_name, vram_total_gb = detect_gpu_capabilities()
 
     return {
-        "cpu_cores": cpu_cores,
-        "cpu_threads": cpu_threads,
+        "cpu_cores": _CPU_CORES,
+        "cpu_threads": _CPU_THREADS,
         "ram_total_gb": ram_total_gb,
         "gpu_name": gpu_name,
         "vram_total_gb": vram_total_gb,
@@ -129,7 +185,7 @@ def collect_metrics(running_jobs: int = 0) -> dict[str, float | int | None]:
 
     metrics: dict[str, float | int | None] = {
         "cpu_percent": float(psutil.cpu_percent(interval=None)),
-        "ram_used_gb": round(memory.used / (1024**3), 3),
+        "ram_used_gb": round(memory.used * _GB, 3),
         "ram_percent": float(memory.percent),
         "gpu_percent": gpu_percent,
         "vram_used_gb": vram_used_gb,
@@ -138,15 +194,15 @@ def collect_metrics(running_jobs: int = 0) -> dict[str, float | int | None]:
     return metrics
 
 
-def _task_types_from_capabilities(capabilities: dict[str, object]) -> list[str]:
-    has_gpu = bool(capabilities.get("gpu_name"))
-    if has_gpu:
-        return ["INFERENCE", "EMBEDDINGS", "INDEX", "TOKENIZE", "PREPROCESS"]
-    return ["EMBEDDINGS", "INDEX", "TOKENIZE", "PREPROCESS"]
+def _task_types_from_capabilities(capabilities: dict[str, object]) -> tuple[str, ...]:
+    if capabilities.get("gpu_name"):
+        return _GPU_TASK_TYPES
+    return _CPU_TASK_TYPES
 
 
 def build_register_payload(node_id: str) -> dict[str, object]:
-    capabilities = detect_capabilities()
+    # detect_capabilities() is cached per process; copy before adding fields.
+    capabilities = dict(detect_capabilities())
     capabilities["task_types"] = _task_types_from_capabilities(capabilities)
 
     return {
@@ -213,28 +269,35 @@ def _execute_task(task: dict[str, object]) -> dict[str, object]:
     return {"message": "Unknown task type", "task_type": task_type}
 
 
-async def register(client: httpx.AsyncClient, node_id: str) -> None:
+async def _post_json(
+    client: httpx.AsyncClient, url: str, payload: dict[str, object]
+) -> httpx.Response:
     response = await client.post(
-        "/v1/agent/register", json=build_register_payload(node_id)
+        url, content=orjson.dumps(payload), headers=_JSON_HEADERS
     )
     response.raise_for_status()
+    return response
+
+
+async def register(client: httpx.AsyncClient, node_id: str) -> None:
+    # psutil, nvidia-smi and the IP probe block, so build the payload off the loop.
+    payload = await asyncio.to_thread(build_register_payload, node_id)
+    await _post_json(client, "/v1/agent/register", payload)
 
 
 async def send_heartbeat(
     client: httpx.AsyncClient, node_id: str, running_jobs: int
 ) -> None:
-    response = await client.post(
-        "/v1/agent/heartbeat",
-        json=build_heartbeat_payload(node_id, running_jobs=running_jobs),
+    payload = await asyncio.to_thread(
+        build_heartbeat_payload, node_id, running_jobs=running_jobs
     )
-    response.raise_for_status()
+    await _post_json(client, "/v1/agent/heartbeat", payload)
 
 
 async def pull_task(
     client: httpx.AsyncClient, node_id: str
 ) -> dict[str, object] | None:
-    response = await client.post("/v1/tasks/pull", json={"node_id": node_id})
-    response.raise_for_status()
+    response = await _post_json(client, "/v1/tasks/pull", {"node_id": node_id})
 
     payload = response.json()
     task = payload.get("task")
@@ -251,39 +314,56 @@ async def submit_task_result(
     output: dict[str, object] | None,
     duration_ms: int,
 ) -> None:
-    response = await client.post(
+    await _post_json(
+        client,
         f"/v1/tasks/{task_id}/result",
-        json={
+        {
             "node_id": node_id,
             "success": success,
             "output": output,
             "duration_ms": duration_ms,
         },
     )
-    response.raise_for_status()
+
+
+async def _sleep_unless_shutdown(delay: float) -> None:
+    with suppress(TimeoutError):
+        await asyncio.wait_for(shutdown_event.wait(), timeout=delay)
+
+
+def _install_signal_handlers() -> None:
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        # Not available on Windows event loops; Ctrl+C still raises KeyboardInterrupt.
+        with suppress(NotImplementedError):
+            loop.add_signal_handler(sig, shutdown_event.set)
 
 
 async def run_agent() -> None:
     node_id = load_or_create_node_id(settings.state_file)
     logger.info(
-        "agent_starting", extra={"node_id": node_id, "settings": asdict(settings)}
+        "agent_starting", extra={"node_id": node_id, "settings": _SETTINGS_DICT}
     )
 
+    _install_signal_handlers()
     retry_delay = 1.0
     running_jobs = 0
     next_heartbeat_at = 0.0
 
     async with httpx.AsyncClient(
         base_url=settings.coordinator_url,
-        timeout=20.0,
+        timeout=_HTTP_TIMEOUT,
+        limits=_HTTP_LIMITS,
         headers=_agent_headers(),
     ) as client:
-        while True:
+        while not shutdown_event.is_set():
             try:
                 await register(client=client, node_id=node_id)
                 logger.info("agent_registered", extra={"node_id": node_id})
                 break
             except Exception as exc:  # noqa: BLE001
+                # The route may have changed; re-probe the address on the next attempt.
+                detect_ip.cache_clear()
                 logger.warning(
                     "agent_register_failed",
                     extra={
@@ -292,13 +372,13 @@ async def run_agent() -> None:
                         "retry_delay_seconds": retry_delay,
                     },
                 )
-                await asyncio.sleep(retry_delay)
+                await _sleep_unless_shutdown(random.uniform(0, retry_delay))
                 retry_delay = min(retry_delay * 2, 30.0)
 
         retry_delay = 1.0
         next_heartbeat_at = time.monotonic()
 
-        while True:
+        while not shutdown_event.is_set():
             try:
                 now = time.monotonic()
                 if now >= next_heartbeat_at:
@@ -315,12 +395,12 @@ async def run_agent() -> None:
 
                 task = await pull_task(client=client, node_id=node_id)
                 if task is None:
-                    await asyncio.sleep(settings.task_poll_seconds)
+                    await _sleep_unless_shutdown(settings.task_poll_seconds)
                     continue
 
                 task_id = str(task.get("id", ""))
                 if not task_id:
-                    await asyncio.sleep(settings.task_poll_seconds)
+                    await _sleep_unless_shutdown(settings.task_poll_seconds)
                     continue
 
                 running_jobs += 1
@@ -364,9 +444,11 @@ async def run_agent() -> None:
                         "retry_delay_seconds": retry_delay,
                     },
                 )
-                await asyncio.sleep(retry_delay)
+                await _sleep_unless_shutdown(random.uniform(0, retry_delay))
                 retry_delay = min(retry_delay * 2, 30.0)
 
+    logger.info("agent_shutdown", extra={"node_id": node_id})
+
 
 def main() -> None:
     try:
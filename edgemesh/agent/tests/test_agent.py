@@ -3,6 +3,8 @@ from pathlib import Path
 from agent_service.main import (
     _task_types_from_capabilities,
     build_heartbeat_payload,
+    build_register_payload,
+    detect_capabilities,
     load_or_create_node_id,
 )
 
@@ -25,6 +27,14 @@ def test_task_types_prefer_gpu_for_inference() -> None:
     assert "INFERENCE" not in cpu_types
 
 
+def test_register_payload_does_not_mutate_cached_capabilities() -> None:
+    payload = build_register_payload("node-abc")
+
+    assert detect_capabilities() is detect_capabilities()
+    assert "task_types" in payload["capabilities"]
+    assert "task_types" not in detect_capabilities()
+
+
 def test_build_heartbeat_payload_shape() -> None:
     payload = build_heartbeat_payload("node-abc")
 
@@ -1,19 +1,32 @@
 import hmac
-import os
 
-from fastapi import Header, HTTPException, status
+from fastapi import HTTPException, Security, status
+from fastapi.security import APIKeyHeader
 
 _SECRET_HEADER = "X-EdgeMesh-Secret"
+_secret_header = APIKeyHeader(name=_SECRET_HEADER, auto_error=False)
+_agent_secret = b""
+
+
+def configure_agent_secret(secret: str) -> None:
+    """Set the shared secret agents must present; empty disables the check."""
+
+    global _agent_secret
+    _agent_secret = secret.strip().encode()
+
+
+def expected_agent_secret() -> bytes:
+    return _agent_secret
 
 
 def require_agent_secret(
-    x_edgemesh_secret: str | None = Header(default=None, alias=_SECRET_HEADER),
+    x_edgemesh_secret: str | None = Security(_secret_header),
 ) -> None:
-    expected = os.getenv("EDGE_MESH_SHARED_SECRET", "").strip()
+    expected = expected_agent_secret()
     if not expected:
         return
 
-    provided = (x_edgemesh_secret or "").strip()
+    provided = (x_edgemesh_secret or "").strip().encode()
     if not hmac.compare_digest(provided, expected):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
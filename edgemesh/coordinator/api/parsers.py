@@ -0,0 +1,40 @@
+from functools import lru_cache
+from types import MappingProxyType
+
+from fastapi import HTTPException
+
+from models import JobStatus, TaskType
+
+_TASK_TYPE_MAP: MappingProxyType[str, TaskType] = MappingProxyType(
+    {
+        "INFER": TaskType.INFERENCE,
+        "INFERENCE": TaskType.INFERENCE,
+        "EMBED": TaskType.EMBEDDINGS,
+        "EMBEDDING": TaskType.EMBEDDINGS,
+        "EMBEDDINGS": TaskType.EMBEDDINGS,
+        "INDEX": TaskType.INDEX,
+        "TOKENIZE": TaskType.TOKENIZE,
+        "PREPROCESS": TaskType.PREPROCESS,
+        "PREPROCESSING": TaskType.PREPROCESS,
+    }
+)
+
+_JOB_STATUS_MAP: MappingProxyType[str, JobStatus] = MappingProxyType(
+    {status.value: status for status in JobStatus}
+)
+
+
+@lru_cache(maxsize=32)
+def parse_task_type(raw: str) -> TaskType:
+    task_type = _TASK_TYPE_MAP.get(raw.strip().upper())
+    if task_type is None:
+        raise HTTPException(status_code=422, detail=f"Unsupported task_type '{raw}'")
+    return task_type
+
+
+@lru_cache(maxsize=32)
+def parse_job_status(raw: str) -> JobStatus:
+    parsed = _JOB_STATUS_MAP.get(raw.strip().upper())
+    if parsed is None:
+        raise HTTPException(status_code=422, detail=f"Unsupported status '{raw}'")
+    return parsed
@@ -0,0 +1,45 @@
+from collections.abc import Iterable, Iterator
+from itertools import islice
+
+import orjson
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+
+# Matches the repository's yield_per batch, so the prefetch is one DB round trip.
+_PREFETCH_SIZE = 500
+
+
+def _encode(item: BaseModel) -> bytes:
+    return orjson.dumps(item.model_dump(mode="json"))
+
+
+def _encode_head(items: Iterator[BaseModel]) -> tuple[bytes, bool]:
+    head = [_encode(item) for item in islice(items, _PREFETCH_SIZE)]
+    return b"[" + b",".join(head), len(head) < _PREFETCH_SIZE
+
+
+def _encode_tail(head: bytes, items: Iterator[BaseModel]) -> Iterator[bytes]:
+    yield head
+    for item in items:
+        yield b"," + _encode(item)
+    yield b"]"
+
+
+async def json_array_response(items: Iterable[BaseModel]) -> Response:
+    """Respond with `items` as a JSON array, streaming rows past the first batch.
+
+    The first batch is read and encoded before any byte is sent, so a failing
+    query still surfaces as a 5xx, and results that fit in it are returned as a
+    plain response. Beyond that the status line and the opening `[` are already
+    sent: an error mid-stream truncates the body (unparseable JSON), and the
+    underlying session stays open until the client has read every row.
+    """
+
+    iterator = iter(items)
+    head, exhausted = await run_in_threadpool(_encode_head, iterator)
+    if exhausted:
+        return Response(content=head + b"]", media_type="application/json")
+    return StreamingResponse(
+        _encode_tail(head, iterator), media_type="application/json"
+    )
@@ -1,22 +1,32 @@
 import uuid
+from collections import Counter
 from datetime import datetime, timezone
 
 from fastapi import APIRouter, Body, HTTPException, Query, status
-
-from api.schemas import DemoJobBurstResponse, JobCreateRequest, JobStatusUpdateRequest
+from fastapi.responses import Response
+
+from api.parsers import parse_job_status, parse_task_type
+from api.responses import json_array_response
+from api.schemas import (
+    DemoJobBurstResponse,
+    JobCountResponse,
+    JobCreateRequest,
+    JobStatusUpdateRequest,
+)
 from api.state import job_event_bus
 from db import (
-    assign_job,
+    count_jobs,
     create_job,
+    create_jobs_bulk,
     create_tasks,
     get_job,
-    get_nodes,
-    list_jobs,
+    iter_jobs,
+    list_eligible_nodes,
     list_tasks,
     transition_job_status,
 )
 from models import Job, JobStatus, JobUpdateEvent, Task, TaskType
-from scheduler import evaluate_node_eligibility, score_node
+from scheduler import score_nodes_batch
 
 router = APIRouter(prefix="/v1", tags=["jobs"])
 
@@ -38,53 +48,14 @@ async def _publish_job_update(job: Job) -> None:
     )
 
 
-def _parse_task_type(raw: str) -> TaskType:
-    normalized = raw.strip().upper()
-    mapping = {
-        "INFER": TaskType.INFERENCE,
-        "INFERENCE": TaskType.INFERENCE,
-        "EMBED": TaskType.EMBEDDINGS,
-        "EMBEDDING": TaskType.EMBEDDINGS,
-        "EMBEDDINGS": TaskType.EMBEDDINGS,
-        "INDEX": TaskType.INDEX,
-        "TOKENIZE": TaskType.TOKENIZE,
-        "PREPROCESS": TaskType.PREPROCESS,
-        "PREPROCESSING": TaskType.PREPROCESS,
-    }
-
-    task_type = mapping.get(normalized)
-    if task_type is None:
-        raise HTTPException(status_code=422, detail=f"Unsupported task_type '{raw}'")
-    return task_type
-
-
-def _parse_job_status(raw: str) -> JobStatus:
-    normalized = raw.strip().upper()
-    mapping = {
-        "QUEUED": JobStatus.QUEUED,
-        "RUNNING": JobStatus.RUNNING,
-        "COMPLETED": JobStatus.COMPLETED,
-        "FAILED": JobStatus.FAILED,
-        "CANCELLED": JobStatus.CANCELLED,
-    }
-
-    parsed = mapping.get(normalized)
-    if parsed is None:
-        raise HTTPException(status_code=422, detail=f"Unsupported status '{raw}'")
-    return parsed
-
-
 def _pick_node_for_task(task_type: TaskType) -> str | None:
-    candidates: list[tuple[str, bool, float]] = []
-
-    for node in get_nodes():
-        eligible, _ = evaluate_node_eligibility(node, task_type)
-        score = score_node(node, task_type)
-        candidates.append((node.identity.node_id, eligible, score))
-
-    candidates.sort(key=lambda item: (item[1], item[2]), reverse=True)
-    chosen = next((candidate for candidate in candidates if candidate[1]), None)
-    return chosen[0] if chosen is not None else None
+    eligible = list_eligible_nodes(task_type)
+    best = max(
+        zip(score_nodes_batch(eligible, task_type), eligible),
+        key=lambda pair: pair[0],
+        default=None,
+    )
+    return best[1].identity.node_id if best is not None else None
 
 
 def _build_task_payloads(
@@ -130,7 +101,7 @@ async def create_job_route(
 ) -> Job:
     """Create a distributed job and split it into executable tasks."""
 
-    task_type = _parse_task_type(payload.task_type)
+    task_type = parse_task_type(payload.task_type)
 
     job = create_job(
         Job(
@@ -158,21 +129,79 @@ async def create_job_route(
     return refreshed
 
 
+@router.post(
+    "/jobs/bulk", response_model=list[Job], status_code=status.HTTP_201_CREATED
+)
+async def create_jobs_bulk_route(
+    payloads: list[JobCreateRequest] = Body(..., min_length=1, max_length=200),
+) -> list[Job]:
+    """Create several jobs and their tasks in a single transaction."""
+
+    now = _utc_now()
+    new_jobs: list[Job] = []
+    task_payloads: list[list[dict[str, object]]] = []
+    for payload in payloads:
+        task_type = parse_task_type(payload.task_type)
+        new_jobs.append(
+            Job(
+                id=f"job-{uuid.uuid4().hex[:12]}",
+                type=task_type,
+                status=JobStatus.QUEUED,
+                payload_ref=payload.payload_ref,
+                created_at=now,
+                updated_at=now,
+            )
+        )
+        task_payloads.append(_build_task_payloads(payload, task_type))
+
+    jobs = create_jobs_bulk(
+        new_jobs,
+        task_payloads,
+        max_retries=[payload.max_task_retries for payload in payloads],
+    )
+    for job in jobs:
+        await _publish_job_update(job)
+    return jobs
+
+
 @router.get("/jobs", response_model=list[Job])
 async def list_jobs_route(
     status_filter: str | None = Query(default=None, alias="status"),
     task_type_filter: str | None = Query(default=None, alias="task_type"),
     node_id: str | None = Query(default=None),
-) -> list[Job]:
+) -> Response:
     """List jobs with optional filters by status, task_type, and node_id."""
 
     status_value = (
-        _parse_job_status(status_filter) if status_filter is not None else None
+        parse_job_status(status_filter) if status_filter is not None else None
     )
     task_type_value = (
-        _parse_task_type(task_type_filter) if task_type_filter is not None else None
+        parse_task_type(task_type_filter) if task_type_filter is not None else None
+    )
+    return await json_array_response(
+        iter_jobs(status=status_value, task_type=task_type_value, node_id=node_id)
+    )
+
+
+@router.get("/jobs/count", response_model=JobCountResponse)
+async def count_jobs_route(
+    status_filter: str | None = Query(default=None, alias="status"),
+    task_type_filter: str | None = Query(default=None, alias="task_type"),
+    node_id: str | None = Query(default=None),
+) -> JobCountResponse:
+    """Count jobs matching the same filters as the job listing."""
+
+    status_value = (
+        parse_job_status(status_filter) if status_filter is not None else None
+    )
+    task_type_value = (
+        parse_task_type(task_type_filter) if task_type_filter is not None else None
+    )
+    return JobCountResponse(
+        count=count_jobs(
+            status=status_value, task_type=task_type_value, node_id=node_id
+        )
     )
-    return list_jobs(status=status_value, task_type=task_type_value, node_id=node_id)
 
 
 @router.get("/jobs/{job_id}", response_model=Job)
@@ -231,57 +260,50 @@ async def create_embed_burst(
 ) -> DemoJobBurstResponse:
     """Create a burst of EMBED jobs split into tasks for distributed execution demo."""
 
-    jobs: list[Job] = []
-    assigned_count = 0
+    # Node metrics only change on heartbeat, so one ranking serves the whole burst.
+    assigned_node_id = _pick_node_for_task(TaskType.EMBEDDINGS)
+    assigned_count = count if assigned_node_id is not None else 0
 
+    now = _utc_now()
+    new_jobs: list[Job] = []
+    task_payloads: list[list[dict[str, object]]] = []
     for index in range(count):
-        job = create_job(
+        payload_ref = f"demo://embed/{index:04d}"
+        new_jobs.append(
             Job(
                 id=f"job-{uuid.uuid4().hex[:12]}",
                 type=TaskType.EMBEDDINGS,
                 status=JobStatus.QUEUED,
-                payload_ref=f"demo://embed/{index:04d}",
-                updated_at=_utc_now(),
+                payload_ref=payload_ref,
+                assigned_node_id=assigned_node_id,
+                created_at=now,
+                updated_at=now,
             )
         )
-
-        payloads = [
-            {
-                "task_index": task_index,
-                "task_type": TaskType.EMBEDDINGS.value,
-                "payload_ref": job.payload_ref,
-                "text": f"demo chunk {index:04d}-{task_index:02d}",
-            }
-            for task_index in range(tasks_per_job)
-        ]
-        create_tasks(
-            job_id=job.id,
-            task_type=TaskType.EMBEDDINGS,
-            payloads=payloads,
-            max_retries=2,
+        task_payloads.append(
+            [
+                {
+                    "task_index": task_index,
+                    "task_type": TaskType.EMBEDDINGS.value,
+                    "payload_ref": payload_ref,
+                    "text": f"demo chunk {index:04d}-{task_index:02d}",
+                }
+                for task_index in range(tasks_per_job)
+            ]
         )
 
-        assigned_node_id = _pick_node_for_task(TaskType.EMBEDDINGS)
-        if assigned_node_id is not None:
-            assigned_count += 1
-            assign_job(job.id, assigned_node_id)
-
-        refreshed = get_job(job.id)
-        if refreshed is not None:
-            jobs.append(refreshed)
-            await _publish_job_update(refreshed)
+    jobs = create_jobs_bulk(new_jobs, task_payloads, max_retries=2)
+    for job in jobs:
+        await _publish_job_update(job)
 
-    queued_count = sum(1 for item in jobs if item.status == JobStatus.QUEUED)
-    running_count = sum(1 for item in jobs if item.status == JobStatus.RUNNING)
-    completed_count = sum(1 for item in jobs if item.status == JobStatus.COMPLETED)
-    failed_count = sum(1 for item in jobs if item.status == JobStatus.FAILED)
+    status_counts = Counter(item.status for item in jobs)
 
     return DemoJobBurstResponse(
         created_count=count,
         assigned_count=assigned_count,
-        queued_count=queued_count,
-        running_count=running_count,
-        completed_count=completed_count,
-        failed_count=failed_count,
+        queued_count=status_counts[JobStatus.QUEUED],
+        running_count=status_counts[JobStatus.RUNNING],
+        completed_count=status_counts[JobStatus.COMPLETED],
+        failed_count=status_counts[JobStatus.FAILED],
         jobs=jobs,
     )
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, Body, HTTPException, Query
+from fastapi.responses import Response
 
-from db import get_node, get_nodes, update_node_policy
+from api.responses import json_array_response
+from db import get_node, iter_nodes, update_node_policy
 from models import Node, NodeDetail, NodePolicy, TaskType
 from api.state import metrics_history_buffer
 
@@ -8,7 +10,7 @@ router = APIRouter(prefix="/v1/nodes", tags=["nodes"])
 
 
 @router.get("", response_model=list[Node])
-async def list_nodes() -> list[Node]:
+async def list_nodes() -> Response:
     """List all known nodes.
 
     Returns each node with identity, capabilities, latest metrics, policy, and status.
@@ -30,7 +32,7 @@ async def list_nodes() -> list[Node]:
     }
     """
 
-    return get_nodes()
+    return await json_array_response(iter_nodes())
 
 
 @router.get("/{node_id}", response_model=NodeDetail)
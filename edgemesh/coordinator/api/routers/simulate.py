@@ -1,37 +1,17 @@
-from fastapi import APIRouter, Body, HTTPException
+from fastapi import APIRouter, Body
 
+from api.parsers import parse_task_type
 from api.schemas import (
     CandidateScore,
     SimulateScheduleRequest,
     SimulateScheduleResponse,
 )
 from db import get_nodes
-from models import TaskType
-from scheduler import evaluate_node_eligibility, score_node
+from scheduler import evaluate_node_eligibility, score_nodes_batch
 
 router = APIRouter(prefix="/v1/simulate", tags=["scheduler"])
 
 
-def _parse_task_type(raw: str) -> TaskType:
-    normalized = raw.strip().upper()
-    mapping = {
-        "INFER": TaskType.INFERENCE,
-        "INFERENCE": TaskType.INFERENCE,
-        "EMBED": TaskType.EMBEDDINGS,
-        "EMBEDDING": TaskType.EMBEDDINGS,
-        "EMBEDDINGS": TaskType.EMBEDDINGS,
-        "INDEX": TaskType.INDEX,
-        "TOKENIZE": TaskType.TOKENIZE,
-        "PREPROCESS": TaskType.PREPROCESS,
-        "PREPROCESSING": TaskType.PREPROCESS,
-    }
-
-    task_type = mapping.get(normalized)
-    if task_type is None:
-        raise HTTPException(status_code=422, detail=f"Unsupported task_type '{raw}'")
-    return task_type
-
-
 @router.post("/schedule", response_model=SimulateScheduleResponse)
 async def simulate_schedule(
     payload: SimulateScheduleRequest = Body(
@@ -54,13 +34,12 @@ async def simulate_schedule(
     role preference alignment, hardware affinity, and running jobs penalty.
     """
 
-    task_type = _parse_task_type(payload.task_type)
+    task_type = parse_task_type(payload.task_type)
     nodes = get_nodes()
 
     candidates: list[CandidateScore] = []
-    for node in nodes:
+    for node, score in zip(nodes, score_nodes_batch(nodes, task_type)):
         eligible, reasons = evaluate_node_eligibility(node, task_type)
-        score = score_node(node, task_type)
         candidates.append(
             CandidateScore(
                 node_id=node.identity.node_id,
@@ -1,5 +1,4 @@
-import asyncio
-
+import anyio
 from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
 
@@ -16,19 +15,17 @@ async def stream_nodes(request: Request) -> StreamingResponse:
     """
 
     async def generator():
-        queue = await node_event_bus.subscribe()
+        events = await node_event_bus.subscribe()
         try:
-            while True:
-                if await request.is_disconnected():
-                    break
-
-                try:
-                    event = await asyncio.wait_for(queue.get(), timeout=15)
-                    yield f"event: node_update\ndata: {event.model_dump_json()}\n\n"
-                except asyncio.TimeoutError:
+            while not await request.is_disconnected():
+                with anyio.move_on_after(15) as keep_alive:
+                    data = await events.receive()
+                if keep_alive.cancelled_caught:
                     yield ": keep-alive\n\n"
+                else:
+                    yield f"event: node_update\ndata: {data}\n\n"
         finally:
-            await node_event_bus.unsubscribe(queue)
+            await node_event_bus.unsubscribe(events)
 
     return StreamingResponse(generator(), media_type="text/event-stream")
 
@@ -41,18 +38,16 @@ async def stream_jobs(request: Request) -> StreamingResponse:
     """
 
     async def generator():
-        queue = await job_event_bus.subscribe()
+        events = await job_event_bus.subscribe()
         try:
-            while True:
-                if await request.is_disconnected():
-                    break
-
-                try:
-                    event = await asyncio.wait_for(queue.get(), timeout=15)
-                    yield f"event: job_update\ndata: {event.model_dump_json()}\n\n"
-                except asyncio.TimeoutError:
+            while not await request.is_disconnected():
+                with anyio.move_on_after(15) as keep_alive:
+                    data = await events.receive()
+                if keep_alive.cancelled_caught:
                     yield ": keep-alive\n\n"
+                else:
+                    yield f"event: job_update\ndata: {data}\n\n"
         finally:
-            await job_event_bus.unsubscribe(queue)
+            await job_event_bus.unsubscribe(events)
 
     return StreamingResponse(generator(), media_type="text/event-stream")
@@ -79,6 +79,10 @@ class JobCreateRequest(BaseModel):
     max_task_retries: int = Field(default=2, ge=0, le=20)
 
 
+class JobCountResponse(BaseModel):
+    count: int
+
+
 class JobStatusUpdateRequest(BaseModel):
     status: JobStatus
     error: str | None = Field(default=None, max_length=2048)
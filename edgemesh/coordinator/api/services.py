@@ -1,3 +1,7 @@
+from collections.abc import Callable
+from functools import lru_cache
+from types import MappingProxyType
+
 from coordinator_service.models import AgentRegisterRequest, HeartbeatRequest
 from api.schemas import (
     AgentCapabilitiesPayload,
@@ -6,31 +10,23 @@ from api.schemas import (
     AgentRegisterV1Request,
 )
 from api.state import metrics_history_buffer, node_event_bus
-from db import update_node_metrics, upsert_node_capabilities, upsert_node_identity
-from models import Node, NodeCapabilities, NodeMetrics, NodeUpdateEvent, TaskType
-
-
-def _parse_int(value: object, default: int = 0) -> int:
-    if isinstance(value, int):
-        return value
-    if isinstance(value, str) and value.isdigit():
-        return int(value)
-    return default
+from db import queue_node_metrics, register_node
+from models import (
+    Node,
+    NodeCapabilities,
+    NodeMetrics,
+    NodeStatus,
+    NodeUpdateEvent,
+    TaskType,
+)
 
 
-def _parse_float(value: object, default: float = 0.0) -> float:
-    if isinstance(value, int | float):
-        return float(value)
-    if isinstance(value, str):
-        try:
-            return float(value)
-        except ValueError:
-            return default
-    return default
+# Heartbeat metrics are plain floats/ints, so a field walk is JSON-safe as is.
+_HEARTBEAT_METRIC_FIELDS = tuple(AgentHeartbeatMetricsPayload.model_fields)
 
 
-def _extract_task_types(labels: list[str]) -> list[TaskType]:
-    mapping = {
+_LABEL_TO_TASK: MappingProxyType[str, TaskType] = MappingProxyType(
+    {
         "infer": TaskType.INFERENCE,
         "inference": TaskType.INFERENCE,
         "embed": TaskType.EMBEDDINGS,
@@ -41,36 +37,95 @@ def _extract_task_types(labels: list[str]) -> list[TaskType]:
         "preprocess": TaskType.PREPROCESS,
         "preprocessing": TaskType.PREPROCESS,
     }
+)
+
+
+def _whole_number(
+    value: object, minimum: int, maximum: int | None = None
+) -> int | None:
+    """Integral value within bounds; fractional, out-of-range or unparseable is None."""
+
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not number.is_integer() or number < minimum:
+        return None
+    if maximum is not None and number > maximum:
+        return None
+    return int(number)
+
+
+def _positive_int(value: object) -> int | None:
+    return _whole_number(value, 1)
+
+
+def _positive_float(value: object) -> float | None:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    # `not number > 0` also rejects NaN.
+    if not number > 0 or number == float("inf"):
+        return None
+    return number
+
 
+def _str_or_none(value: object) -> str | None:
+    return str(value) if value else None
+
+
+# (metadata key, caster); each caster maps falsy, unparseable or values the v1
+# payload would reject to None, so odd legacy metadata never fails validation.
+_LEGACY_CAPABILITY_FIELDS: tuple[tuple[str, Callable[[object], object]], ...] = (
+    ("cpu_cores", _positive_int),
+    ("cpu_threads", _positive_int),
+    ("ram_total_gb", _positive_float),
+    ("gpu_name", _str_or_none),
+    ("vram_total_gb", _positive_float),
+    ("os", _str_or_none),
+    ("arch", _str_or_none),
+)
+
+
+def _str_or(value: object, default: str) -> str:
+    # Metadata values are usually already non-empty strings; skip the str() copy.
+    if isinstance(value, str) and value:
+        return value
+    return str(value) if value else default
+
+
+@lru_cache(maxsize=1024)
+def _extract_task_types(labels: tuple[str, ...]) -> tuple[TaskType, ...]:
+    seen: set[TaskType] = set()
     task_types: list[TaskType] = []
     for label in labels:
-        task_type = mapping.get(label.strip().lower())
-        if task_type is not None and task_type not in task_types:
+        task_type = _LABEL_TO_TASK.get(label.strip().lower())
+        if task_type is not None and task_type not in seen:
+            seen.add(task_type)
             task_types.append(task_type)
 
-    return task_types
+    return tuple(task_types)
 
 
+@lru_cache(maxsize=1024)
 def _normalize_task_types(
-    task_types: list[TaskType], labels: list[str]
-) -> list[TaskType]:
-    normalized: list[TaskType] = []
-
-    for task_type in task_types:
-        if task_type not in normalized:
-            normalized.append(task_type)
+    task_types: tuple[TaskType, ...], labels: tuple[str, ...]
+) -> tuple[TaskType, ...]:
+    # dict.fromkeys dedupes while keeping first-seen order.
+    normalized = tuple(dict.fromkeys(task_types))
 
     if not normalized:
         normalized = _extract_task_types(labels)
 
     if not normalized:
-        normalized = list(TaskType)
+        normalized = tuple(TaskType)
 
     return normalized
 
 
 def _build_node_capabilities(payload: AgentCapabilitiesPayload) -> NodeCapabilities:
-    task_types = _normalize_task_types(payload.task_types, payload.labels)
+    task_types = _normalize_task_types(tuple(payload.task_types), tuple(payload.labels))
 
     has_gpu = payload.gpu_name is not None or payload.vram_total_gb is not None
     return NodeCapabilities(
@@ -88,19 +143,21 @@ def _build_node_capabilities(payload: AgentCapabilitiesPayload) -> NodeCapabilit
 
 
 def register_agent_v1(payload: AgentRegisterV1Request) -> Node:
-    upsert_node_identity(
+    return register_node(
         node_id=payload.node_id,
         display_name=payload.display_name,
         ip=payload.ip,
         port=payload.port,
-    )
-    return upsert_node_capabilities(
-        node_id=payload.node_id,
         capabilities=_build_node_capabilities(payload.capabilities),
     )
 
 
 async def heartbeat_agent_v1(payload: AgentHeartbeatV1Request) -> NodeUpdateEvent:
+    extra = {
+        name: value
+        for name in _HEARTBEAT_METRIC_FIELDS
+        if (value := getattr(payload.metrics, name)) is not None
+    }
     metrics = NodeMetrics(
         cpu_percent=payload.metrics.cpu_percent,
         ram_used_gb=payload.metrics.ram_used_gb,
@@ -108,17 +165,17 @@ async def heartbeat_agent_v1(payload: AgentHeartbeatV1Request) -> NodeUpdateEven
         gpu_percent=payload.metrics.gpu_percent,
         vram_used_gb=payload.metrics.vram_used_gb,
         running_jobs=payload.metrics.running_jobs,
-        extra=payload.metrics.model_dump(mode="json", exclude_none=True),
+        extra=extra,
     )
 
-    node = update_node_metrics(node_id=payload.node_id, metrics=metrics)
-    metrics_history_buffer.append(payload.node_id, node.metrics)
+    # Persisted in batches by the heartbeat flusher; reads overlay pending metrics.
+    metrics = queue_node_metrics(node_id=payload.node_id, metrics=metrics)
+    metrics_history_buffer.append(payload.node_id, metrics)
 
     event = NodeUpdateEvent(
-        node_id=node.identity.node_id,
-        status=node.status,
-        metrics=node.metrics,
-        updated_at=node.updated_at,
+        node_id=payload.node_id,
+        status=NodeStatus.ONLINE,
+        metrics=metrics,
     )
     await node_event_bus.publish(event)
     return event
@@ -129,21 +186,16 @@ def to_v1_register_from_legacy(payload: AgentRegisterRequest) -> AgentRegisterV1
 
     return AgentRegisterV1Request(
         node_id=payload.agent_id,
-        display_name=str(metadata.get("display_name") or payload.agent_id),
-        ip=str(metadata.get("ip") or "0.0.0.0"),
-        port=_parse_int(metadata.get("port", 0)),
+        display_name=_str_or(metadata.get("display_name"), payload.agent_id),
+        ip=_str_or(metadata.get("ip"), "0.0.0.0"),
+        port=_whole_number(metadata.get("port"), 0, 65535) or 0,
         capabilities=AgentCapabilitiesPayload(
-            cpu_cores=_parse_int(metadata.get("cpu_cores"), 0) or None,
-            cpu_threads=_parse_int(metadata.get("cpu_threads"), 0) or None,
-            ram_total_gb=_parse_float(metadata.get("ram_total_gb"), 0.0) or None,
-            gpu_name=(
-                str(metadata.get("gpu_name")) if metadata.get("gpu_name") else None
-            ),
-            vram_total_gb=_parse_float(metadata.get("vram_total_gb"), 0.0) or None,
-            os=(str(metadata.get("os")) if metadata.get("os") else None),
-            arch=(str(metadata.get("arch")) if metadata.get("arch") else None),
+            **{
+                name: caster(metadata.get(name))
+                for name, caster in _LEGACY_CAPABILITY_FIELDS
+            },
             labels=payload.capabilities,
-            task_types=_extract_task_types(payload.capabilities),
+            task_types=_extract_task_types(tuple(payload.capabilities)),
         ),
     )
 
@@ -1,93 +1,101 @@
-import asyncio
-from collections import defaultdict, deque
-from collections.abc import Iterable
-from threading import Lock
+from collections import deque
+from itertools import islice
+from typing import Generic, TypeVar
+
+import anyio
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from pydantic import BaseModel
 
 from models import JobUpdateEvent, NodeMetrics, NodeUpdateEvent
 
 
-class NodeEventBus:
-    def __init__(self, queue_size: int = 256) -> None:
-        self._queue_size = queue_size
-        self._subscribers: set[asyncio.Queue[NodeUpdateEvent]] = set()
-        self._lock = asyncio.Lock()
-
-    async def subscribe(self) -> asyncio.Queue[NodeUpdateEvent]:
-        queue: asyncio.Queue[NodeUpdateEvent] = asyncio.Queue(maxsize=self._queue_size)
-        async with self._lock:
-            self._subscribers.add(queue)
-        return queue
-
-    async def unsubscribe(self, queue: asyncio.Queue[NodeUpdateEvent]) -> None:
-        async with self._lock:
-            self._subscribers.discard(queue)
-
-    async def publish(self, event: NodeUpdateEvent) -> None:
-        async with self._lock:
-            subscribers: Iterable[asyncio.Queue[NodeUpdateEvent]] = tuple(
-                self._subscribers
-            )
-
-        for queue in subscribers:
-            if queue.full():
-                try:
-                    queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    pass
-            queue.put_nowait(event)
-
-
-class JobEventBus:
+EventT = TypeVar("EventT", bound=BaseModel)
+
+_Subscriber = tuple[MemoryObjectSendStream[str], MemoryObjectReceiveStream[str]]
+
+
+def _send_dropping_oldest(
+    send: MemoryObjectSendStream[str],
+    recv: MemoryObjectReceiveStream[str],
+    data: str,
+) -> None:
+    try:
+        send.send_nowait(data)
+    except anyio.WouldBlock:
+        # Slow consumer: drop its oldest buffered event to make room.
+        try:
+            recv.receive_nowait()
+        except anyio.WouldBlock:
+            pass
+        send.send_nowait(data)
+
+
+class _EventBus(Generic[EventT]):
+    """Fan out events to SSE subscribers as pre-serialized JSON strings."""
+
     def __init__(self, queue_size: int = 256) -> None:
         self._queue_size = queue_size
-        self._subscribers: set[asyncio.Queue[JobUpdateEvent]] = set()
-        self._lock = asyncio.Lock()
-
-    async def subscribe(self) -> asyncio.Queue[JobUpdateEvent]:
-        queue: asyncio.Queue[JobUpdateEvent] = asyncio.Queue(maxsize=self._queue_size)
-        async with self._lock:
-            self._subscribers.add(queue)
-        return queue
-
-    async def unsubscribe(self, queue: asyncio.Queue[JobUpdateEvent]) -> None:
-        async with self._lock:
-            self._subscribers.discard(queue)
-
-    async def publish(self, event: JobUpdateEvent) -> None:
-        async with self._lock:
-            subscribers: Iterable[asyncio.Queue[JobUpdateEvent]] = tuple(
-                self._subscribers
-            )
-
-        for queue in subscribers:
-            if queue.full():
-                try:
-                    queue.get_nowait()
-                except asyncio.QueueEmpty:
-                    pass
-            queue.put_nowait(event)
+        # Only touched from coroutines on the app's single event loop, so no
+        # lock; publish iterates a snapshot tuple that subscribers replace.
+        self._subscribers: tuple[_Subscriber, ...] = ()
+
+    async def subscribe(self) -> MemoryObjectReceiveStream[str]:
+        send, recv = anyio.create_memory_object_stream[str](
+            max_buffer_size=self._queue_size
+        )
+        self._subscribers = (*self._subscribers, (send, recv))
+        return recv
+
+    async def unsubscribe(self, recv: MemoryObjectReceiveStream[str]) -> None:
+        removed = [item for item in self._subscribers if item[1] is recv]
+        self._subscribers = tuple(
+            item for item in self._subscribers if item[1] is not recv
+        )
+        for send, _ in removed:
+            send.close()
+        recv.close()
+
+    async def publish(self, event: EventT) -> None:
+        subscribers = self._subscribers
+        if not subscribers:
+            return
+
+        data = event.model_dump_json()
+        for send, recv in subscribers:
+            try:
+                _send_dropping_oldest(send, recv, data)
+            except (anyio.BrokenResourceError, anyio.ClosedResourceError):
+                # Subscriber is tearing down; unsubscribe will drop it.
+                pass
+
+
+class NodeEventBus(_EventBus[NodeUpdateEvent]):
+    pass
+
+
+class JobEventBus(_EventBus[JobUpdateEvent]):
+    pass
 
 
 class MetricsHistoryBuffer:
     def __init__(self, max_samples: int = 256) -> None:
         self._max_samples = max_samples
-        self._samples: dict[str, deque[NodeMetrics]] = defaultdict(
-            lambda: deque(maxlen=self._max_samples)
-        )
-        self._lock = Lock()
+        # No lock: dict.setdefault and bounded deque.append are atomic under the GIL.
+        self._samples: dict[str, deque[NodeMetrics]] = {}
 
     def append(self, node_id: str, metrics: NodeMetrics) -> None:
-        with self._lock:
-            self._samples[node_id].append(metrics)
+        samples = self._samples.get(node_id)
+        if samples is None:
+            samples = self._samples.setdefault(node_id, deque(maxlen=self._max_samples))
+        samples.append(metrics)
 
     def get(self, node_id: str, limit: int) -> list[NodeMetrics]:
-        with self._lock:
-            samples = self._samples.get(node_id)
-            if not samples:
-                return []
-            items = list(samples)
+        samples = self._samples.get(node_id)
+        if not samples:
+            return []
 
-        return items[-limit:]
+        size = len(samples)
+        return list(islice(samples, max(size - limit, 0), size))
 
 
 node_event_bus = NodeEventBus()
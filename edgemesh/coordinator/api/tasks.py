@@ -2,7 +2,7 @@ import asyncio
 import logging
 
 from api.state import node_event_bus
-from db import mark_offline_if_stale_nodes, recover_stale_tasks
+from db import flush_node_metrics, mark_offline_if_stale_nodes, recover_stale_tasks
 from models import NodeUpdateEvent
 
 logger = logging.getLogger("coordinator")
@@ -38,3 +38,16 @@ async def stale_task_monitor(interval_seconds: int = 3) -> None:
                     "task_ids": [task.id for task in stale_tasks],
                 },
             )
+
+
+async def heartbeat_flusher(interval_seconds: float = 1.0) -> None:
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            flushed = flush_node_metrics()
+        except Exception:
+            # The batch stays queued; retry on the next tick instead of exiting.
+            logger.exception("heartbeat_flush_failed")
+            continue
+        if flushed:
+            logger.debug("heartbeats_flushed", extra={"count": flushed})
@@ -1,15 +1,17 @@
 import asyncio
 import logging
-from contextlib import suppress
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
-from api.auth import require_agent_secret
+from api.auth import configure_agent_secret, require_agent_secret
 from api.routers import (
     agent_router,
     cluster_router,
@@ -27,163 +29,224 @@ from api.services import (
     to_v1_heartbeat_from_legacy,
     to_v1_register_from_legacy,
 )
-from api.tasks import stale_node_monitor, stale_task_monitor
+from api.tasks import heartbeat_flusher, stale_node_monitor, stale_task_monitor
 from coordinator_service.logging_config import configure_logging
 from coordinator_service.models import AgentRegisterRequest, AgentView, HeartbeatRequest
 from coordinator_service.settings import Settings
-from db import get_nodes, init_repository, mark_offline_if_stale
-from models import NodeStatus
+from db import flush_node_metrics, get_nodes, init_repository
+from db.migrate import is_memory_url
+from models import Node, NodeStatus, TaskType
 
 load_dotenv()
 settings = Settings.from_env()
 configure_logging(settings.log_level)
 logger = logging.getLogger("coordinator")
 
-app = FastAPI(title="edgemesh coordinator", version="0.2.0")
-_stale_monitor_task: asyncio.Task[None] | None = None
-_stale_task_monitor_task: asyncio.Task[None] | None = None
+_TASK_TYPE_LABELS = {task_type: task_type.value.lower() for task_type in TaskType}
+_NODE_STATUS_LABELS = {
+    node_status: node_status.value.lower() for node_status in NodeStatus
+}
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=False,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-app.include_router(health_router)
-app.include_router(nodes_router)
-app.include_router(stream_router)
-app.include_router(agent_router)
-app.include_router(tasks_router)
-app.include_router(cluster_router)
-app.include_router(metrics_router)
-app.include_router(simulate_router)
-app.include_router(jobs_router)
-
-
-@app.on_event("startup")
-async def startup() -> None:
-    global _stale_monitor_task, _stale_task_monitor_task
-    init_repository(settings.db_url)
-    _stale_monitor_task = asyncio.create_task(
-        stale_node_monitor(settings.node_stale_seconds)
-    )
-    _stale_task_monitor_task = asyncio.create_task(
-        stale_task_monitor(settings.task_recovery_interval_seconds)
-    )
-    logger.info(
-        "repository_initialized",
-        extra={
-            "db_url": settings.db_url,
-            "node_stale_seconds": settings.node_stale_seconds,
-            "offline_scan_interval_seconds": 5,
-            "task_lease_seconds": settings.task_lease_seconds,
-            "task_recovery_interval_seconds": settings.task_recovery_interval_seconds,
-            "agent_secret_enabled": bool(settings.edge_mesh_shared_secret),
+def _to_agent_view(node: Node, stale_cutoff: datetime) -> AgentView:
+    labels = list(node.capabilities.labels)
+    existing = set(labels)
+    for task_type in node.capabilities.task_types:
+        label = _TASK_TYPE_LABELS[task_type]
+        if label not in existing:
+            existing.add(label)
+            labels.append(label)
+
+    identity = node.identity
+    is_stale = node.status == NodeStatus.OFFLINE or node.last_seen < stale_cutoff
+    return AgentView(
+        agent_id=identity.node_id,
+        capabilities=labels,
+        metadata={
+            "display_name": identity.display_name,
+            "ip": identity.ip,
+            "port": identity.port,
+            "policy_enabled": node.policy.enabled,
         },
+        status="offline" if is_stale else _NODE_STATUS_LABELS[node.status],
+        metrics=node.metrics.extra,
+        last_seen=node.last_seen,
+        is_stale=is_stale,
     )
 
 
-@app.on_event("shutdown")
-async def shutdown() -> None:
-    global _stale_monitor_task, _stale_task_monitor_task
-
-    if _stale_monitor_task is not None:
-        _stale_monitor_task.cancel()
-        with suppress(asyncio.CancelledError):
-            await _stale_monitor_task
-        _stale_monitor_task = None
-
-    if _stale_task_monitor_task is not None:
-        _stale_task_monitor_task.cancel()
-        with suppress(asyncio.CancelledError):
-            await _stale_task_monitor_task
-        _stale_task_monitor_task = None
-
-
-@app.post("/api/agents/register", status_code=status.HTTP_201_CREATED)
-async def register_agent_legacy(
-    payload: AgentRegisterRequest,
-    _: None = Depends(require_agent_secret),
-) -> dict[str, bool]:
-    v1_payload = to_v1_register_from_legacy(payload)
-    register_agent_v1(v1_payload)
-
-    logger.info(
-        "agent_registered",
-        extra={
-            "node_id": v1_payload.node_id,
-            "capabilities": v1_payload.capabilities.labels,
-        },
-    )
-    return {"ok": True}
-
-
-@app.post("/api/agents/{agent_id}/heartbeat", status_code=status.HTTP_202_ACCEPTED)
-async def post_heartbeat_legacy(
-    agent_id: str,
-    payload: HeartbeatRequest,
-    _: None = Depends(require_agent_secret),
-) -> dict[str, bool]:
-    v1_payload = to_v1_heartbeat_from_legacy(agent_id=agent_id, payload=payload)
-    await heartbeat_agent_v1(v1_payload)
-
-    logger.info("heartbeat_received", extra={"node_id": v1_payload.node_id})
-    return {"ok": True}
-
-
-@app.get("/api/agents", response_model=list[AgentView])
-async def list_agents_legacy() -> list[AgentView]:
-    mark_offline_if_stale(settings.node_stale_seconds)
-    nodes = get_nodes()
-
-    response: list[AgentView] = []
-    for node in nodes:
-        capability_labels = list(node.capabilities.labels)
-        for task_type in node.capabilities.task_types:
-            value = task_type.value.lower()
-            if value not in capability_labels:
-                capability_labels.append(value)
-
-        is_stale = node.status == NodeStatus.OFFLINE
-        response.append(
-            AgentView(
-                agent_id=node.identity.node_id,
-                capabilities=capability_labels,
-                metadata={
-                    "display_name": node.identity.display_name,
-                    "ip": node.identity.ip,
-                    "port": node.identity.port,
-                    "policy_enabled": node.policy.enabled,
+class ImmutableStaticFiles(StaticFiles):
+    """Static files with content-hashed names that never change once built."""
+
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["cache-control"] = "public, max-age=31536000, immutable"
+        return response
+
+
+dist_dir = Path(__file__).resolve().parents[3] / "ui" / "dist"
+index_path = dist_dir / "index.html"
+
+
+def _mount_ui(app: FastAPI) -> None:
+    if not index_path.exists():
+
+        @app.get("/", response_class=HTMLResponse, include_in_schema=False)
+        async def root() -> str:
+            return """
+            <html>
+              <head><title>edgemesh coordinator</title></head>
+              <body>
+                <h1>edgemesh coordinator</h1>
+                <p>UI build not found. Run <code>cd ui && npm run build</code> to host UI here.</p>
+                <p>For development, run <code>make ui-dev</code> and open http://localhost:5173.</p>
+              </body>
+            </html>
+            """
+
+        return
+
+    # Vite emits content-hashed bundles under assets/; serve them without
+    # html-mode path probing and let browsers cache them indefinitely.
+    assets_dir = dist_dir / "assets"
+    if assets_dir.is_dir():
+        app.mount(
+            "/assets", ImmutableStaticFiles(directory=assets_dir), name="ui-assets"
+        )
+
+    index_bytes = index_path.read_bytes()
+
+    @app.get("/", include_in_schema=False)
+    async def root() -> Response:
+        return Response(
+            content=index_bytes,
+            media_type="text/html",
+            headers={"cache-control": "no-cache"},
+        )
+
+    # Remaining top-level files (favicon, etc.).
+    app.mount("/", StaticFiles(directory=dist_dir, html=True), name="ui")
+
+
+def create_app(settings: Settings) -> FastAPI:
+    """Build the coordinator app; nothing touches the database until start-up."""
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        configure_agent_secret(settings.edge_mesh_shared_secret)
+        if is_memory_url(settings.db_url):
+            logger.warning(
+                "in_memory_database",
+                extra={
+                    "detail": "sqlite:///:memory: shares one connection and is "
+                    "for tests only; run it without background tasks"
                 },
-                status=node.status.value.lower(),
-                metrics=node.metrics.extra,
-                last_seen=node.last_seen,
-                is_stale=is_stale,
             )
+        init_repository(settings.db_url, pool_size=settings.db_pool_size)
+        background_tasks: list[asyncio.Task[None]] = []
+        if settings.background_tasks_enabled:
+            background_tasks = [
+                asyncio.create_task(stale_node_monitor(settings.node_stale_seconds)),
+                asyncio.create_task(
+                    stale_task_monitor(settings.task_recovery_interval_seconds)
+                ),
+                asyncio.create_task(
+                    heartbeat_flusher(settings.heartbeat_flush_interval_seconds)
+                ),
+            ]
+        logger.info(
+            "repository_initialized",
+            extra={
+                "db_url": settings.db_url,
+                "db_pool_size": settings.db_pool_size,
+                "node_stale_seconds": settings.node_stale_seconds,
+                "offline_scan_interval_seconds": 5,
+                "task_lease_seconds": settings.task_lease_seconds,
+                "task_recovery_interval_seconds": settings.task_recovery_interval_seconds,
+                "heartbeat_flush_interval_seconds": settings.heartbeat_flush_interval_seconds,
+                "agent_secret_enabled": bool(settings.edge_mesh_shared_secret),
+                "background_tasks_enabled": settings.background_tasks_enabled,
+            },
         )
 
-    return response
+        try:
+            yield
+        finally:
+            for task in background_tasks:
+                task.cancel()
+            for task in background_tasks:
+                with suppress(asyncio.CancelledError):
+                    await task
+            flush_node_metrics()
+
+    app = FastAPI(
+        title="edgemesh coordinator",
+        version="0.2.0",
+        default_response_class=ORJSONResponse,
+        lifespan=lifespan,
+    )
 
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=False,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
-dist_dir = Path(__file__).resolve().parents[3] / "ui" / "dist"
-if dist_dir.exists():
-    app.mount("/", StaticFiles(directory=dist_dir, html=True), name="ui")
-else:
-
-    @app.get("/", response_class=HTMLResponse, include_in_schema=False)
-    async def root() -> str:
-        return """
-        <html>
-          <head><title>edgemesh coordinator</title></head>
-          <body>
-            <h1>edgemesh coordinator</h1>
-            <p>UI build not found. Run <code>cd ui && npm run build</code> to host UI here.</p>
-            <p>For development, run <code>make ui-dev</code> and open http://localhost:5173.</p>
-          </body>
-        </html>
-        """
+    app.include_router(health_router)
+    app.include_router(nodes_router)
+    app.include_router(stream_router)
+    app.include_router(agent_router)
+    app.include_router(tasks_router)
+    app.include_router(cluster_router)
+    app.include_router(metrics_router)
+    app.include_router(simulate_router)
+    app.include_router(jobs_router)
+
+    @app.post("/api/agents/register", status_code=status.HTTP_201_CREATED)
+    async def register_agent_legacy(
+        payload: AgentRegisterRequest,
+        _: None = Depends(require_agent_secret),
+    ) -> dict[str, bool]:
+        v1_payload = to_v1_register_from_legacy(payload)
+        register_agent_v1(v1_payload)
+
+        logger.info(
+            "agent_registered",
+            extra={
+                "node_id": v1_payload.node_id,
+                "capabilities": v1_payload.capabilities.labels,
+            },
+        )
+        return {"ok": True}
+
+    @app.post("/api/agents/{agent_id}/heartbeat", status_code=status.HTTP_202_ACCEPTED)
+    async def post_heartbeat_legacy(
+        agent_id: str,
+        payload: HeartbeatRequest,
+        _: None = Depends(require_agent_secret),
+    ) -> dict[str, bool]:
+        v1_payload = to_v1_heartbeat_from_legacy(agent_id=agent_id, payload=payload)
+        await heartbeat_agent_v1(v1_payload)
+
+        logger.info("heartbeat_received", extra={"node_id": v1_payload.node_id})
+        return {"ok": True}
+
+    @app.get("/api/agents", response_model=list[AgentView])
+    async def list_agents_legacy() -> list[AgentView]:
+        # stale_node_monitor persists OFFLINE transitions; here staleness is
+        # derived from last_seen so listing agents never writes to the database.
+        stale_cutoff = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.node_stale_seconds
+        )
+        return [_to_agent_view(node, stale_cutoff) for node in get_nodes()]
+
+    _mount_ui(app)
+    return app
+
+
+app = create_app(settings)
 
 
 if __name__ == "__main__":
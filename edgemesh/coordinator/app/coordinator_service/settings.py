@@ -2,7 +2,7 @@ import os
 from dataclasses import dataclass
 
 
-@dataclass(slots=True)
+@dataclass(frozen=True, slots=True)
 class Settings:
     host: str
     port: int
@@ -11,9 +11,12 @@ class Settings:
     node_stale_seconds: int
     task_lease_seconds: int
     task_recovery_interval_seconds: int
+    heartbeat_flush_interval_seconds: float
     cors_origins: list[str]
     db_url: str
+    db_pool_size: int
     edge_mesh_shared_secret: str
+    background_tasks_enabled: bool = True
 
     @classmethod
     def from_env(cls) -> "Settings":
@@ -37,7 +40,15 @@ class Settings:
             task_recovery_interval_seconds=int(
                 os.getenv("TASK_RECOVERY_INTERVAL_SECONDS", "3")
             ),
+            heartbeat_flush_interval_seconds=float(
+                os.getenv("HEARTBEAT_FLUSH_INTERVAL_SECONDS", "1")
+            ),
             cors_origins=cors_origins,
             db_url=os.getenv("COORDINATOR_DB_URL", "sqlite:///./coordinator.db"),
+            db_pool_size=int(os.getenv("COORDINATOR_DB_POOL_SIZE", "5")),
             edge_mesh_shared_secret=os.getenv("EDGE_MESH_SHARED_SECRET", "").strip(),
+            background_tasks_enabled=os.getenv("COORDINATOR_BACKGROUND_TASKS", "1")
+            .strip()
+            .lower()
+            not in {"0", "false", "no", "off"},
         )
@@ -1,20 +1,28 @@
 from db.repository import (
     CoordinatorRepository,
     assign_job,
+    count_jobs,
     create_job,
+    create_jobs_bulk,
     create_tasks,
+    flush_node_metrics,
     get_execution_metrics,
     get_job,
     get_node,
     get_nodes,
     get_task,
     init_repository,
+    iter_jobs,
+    iter_nodes,
+    list_eligible_nodes,
     list_jobs,
     list_tasks,
     mark_offline_if_stale,
     mark_offline_if_stale_nodes,
     pull_task_for_node,
+    queue_node_metrics,
     recover_stale_tasks,
+    register_node,
     submit_task_result,
     transition_job_status,
     update_node_metrics,
@@ -26,20 +34,28 @@ from db.repository import (
 __all__ = [
     "CoordinatorRepository",
     "assign_job",
+    "count_jobs",
     "create_job",
+    "create_jobs_bulk",
     "create_tasks",
+    "flush_node_metrics",
     "get_execution_metrics",
     "get_job",
     "get_node",
     "get_nodes",
     "get_task",
     "init_repository",
+    "iter_jobs",
+    "iter_nodes",
+    "list_eligible_nodes",
     "list_jobs",
     "list_tasks",
     "mark_offline_if_stale",
     "mark_offline_if_stale_nodes",
     "pull_task_for_node",
+    "queue_node_metrics",
     "recover_stale_tasks",
+    "register_node",
     "submit_task_result",
     "transition_job_status",
     "update_node_metrics",
@@ -0,0 +1,46 @@
+from datetime import datetime
+from threading import Lock
+from typing import NamedTuple
+
+from models import NodeMetrics
+
+
+class PendingHeartbeat(NamedTuple):
+    metrics: NodeMetrics
+    received_at: datetime
+
+
+class HeartbeatCoalescer:
+    """Keep only the latest heartbeat per node until the next flush."""
+
+    def __init__(self) -> None:
+        self._pending: dict[str, PendingHeartbeat] = {}
+        self._lock = Lock()
+
+    def put(self, node_id: str, metrics: NodeMetrics, received_at: datetime) -> None:
+        with self._lock:
+            self._pending[node_id] = PendingHeartbeat(metrics, received_at)
+
+    def get(self, node_id: str) -> PendingHeartbeat | None:
+        return self._pending.get(node_id)
+
+    def discard(self, node_id: str) -> None:
+        with self._lock:
+            self._pending.pop(node_id, None)
+
+    def snapshot(self) -> dict[str, PendingHeartbeat]:
+        """Copy of the queue; entries stay visible to reads until `remove_flushed`."""
+
+        with self._lock:
+            return dict(self._pending)
+
+    def remove_flushed(self, flushed: dict[str, PendingHeartbeat]) -> None:
+        """Drop persisted entries, keeping any newer heartbeat queued meanwhile."""
+
+        with self._lock:
+            for node_id, item in flushed.items():
+                if self._pending.get(node_id) is item:
+                    del self._pending[node_id]
+
+    def __len__(self) -> int:
+        return len(self._pending)
@@ -1,5 +1,9 @@
 import sqlite3
+from functools import lru_cache
 from pathlib import Path
+from threading import Lock
+
+_template_lock = Lock()
 
 
 def _sqlite_path_from_url(db_url: str) -> Path:
@@ -18,34 +22,62 @@ def _sqlite_path_from_url(db_url: str) -> Path:
     return path
 
 
-def apply_migrations(db_url: str) -> None:
-    db_path = _sqlite_path_from_url(db_url)
-    db_path.parent.mkdir(parents=True, exist_ok=True)
+def is_memory_url(db_url: str) -> bool:
+    return db_url == "sqlite:///:memory:"
+
+
+def apply_migrations_to_connection(connection: sqlite3.Connection) -> None:
+    """Apply pending migrations on an open connection (e.g. an in-memory DB)."""
 
     migrations_dir = Path(__file__).resolve().parent / "migrations"
     migration_files = sorted(migrations_dir.glob("*.sql"))
 
-    with sqlite3.connect(db_path) as connection:
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS schema_migrations (version TEXT PRIMARY KEY, applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+    )
+    applied_versions = {
+        row[0]
+        for row in connection.execute(
+            "SELECT version FROM schema_migrations ORDER BY version"
+        ).fetchall()
+    }
+
+    for migration_file in migration_files:
+        version = migration_file.stem
+        if version in applied_versions:
+            continue
+
+        sql = migration_file.read_text(encoding="utf-8")
+        connection.executescript(sql)
         connection.execute(
-            "CREATE TABLE IF NOT EXISTS schema_migrations (version TEXT PRIMARY KEY, applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+            "INSERT INTO schema_migrations(version) VALUES (?)",
+            (version,),
         )
-        applied_versions = {
-            row[0]
-            for row in connection.execute(
-                "SELECT version FROM schema_migrations ORDER BY version"
-            ).fetchall()
-        }
-
-        for migration_file in migration_files:
-            version = migration_file.stem
-            if version in applied_versions:
-                continue
-
-            sql = migration_file.read_text(encoding="utf-8")
-            connection.executescript(sql)
-            connection.execute(
-                "INSERT INTO schema_migrations(version) VALUES (?)",
-                (version,),
-            )
-
-        connection.commit()
+
+    connection.commit()
+
+
+@lru_cache(maxsize=1)
+def _migrated_template() -> sqlite3.Connection:
+    template = sqlite3.connect(":memory:", check_same_thread=False)
+    apply_migrations_to_connection(template)
+    return template
+
+
+def copy_migrated_schema(connection: sqlite3.Connection) -> None:
+    """Fill an empty in-memory DB with the migrated schema via the backup API.
+
+    The migrations run once per process into a template database; every later
+    copy is a page-level clone instead of re-executing the SQL scripts.
+    """
+
+    with _template_lock:
+        _migrated_template().backup(connection)
+
+
+def apply_migrations(db_url: str) -> None:
+    db_path = _sqlite_path_from_url(db_url)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with sqlite3.connect(db_path) as connection:
+        apply_migrations_to_connection(connection)
@@ -0,0 +1,6 @@
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_nodes_status_last_seen ON nodes(status, last_seen);
+CREATE INDEX IF NOT EXISTS idx_jobs_node_status ON jobs(assigned_node_id, status);
+
+COMMIT;
@@ -1,11 +1,30 @@
-import json
 import uuid
+from collections.abc import Iterator
 from datetime import datetime, timedelta, timezone
-
-from sqlalchemy import create_engine, func, or_, select
+from functools import lru_cache
+from threading import Lock
+from typing import TypeVar
+
+import orjson
+from pydantic import BaseModel
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    bindparam,
+    create_engine,
+    event,
+    func,
+    insert,
+    or_,
+    select,
+    update,
+)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from db.migrate import apply_migrations
+from db.heartbeats import HeartbeatCoalescer
+from db.migrate import apply_migrations, copy_migrated_schema, is_memory_url
 from db.orm import JobRecord, NodeRecord, ResultRecord, TaskRecord
 from models import (
     Job,
@@ -28,104 +47,287 @@ def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
-def _as_utc(dt: datetime | None) -> datetime | None:
-    if dt is None:
-        return None
-    if dt.tzinfo is None:
-        return dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(timezone.utc)
+def _json_serializer(value: object) -> str:
+    return orjson.dumps(value, default=str).decode()
 
 
 def _encode_json(value: dict[str, object] | None) -> str:
-    return json.dumps(value or {}, separators=(",", ":"), default=str)
+    return _json_serializer(value or {})
 
 
 def _decode_json(value: str | None) -> dict[str, object]:
     if not value:
         return {}
-    decoded = json.loads(value)
+    decoded = orjson.loads(value)
     if isinstance(decoded, dict):
         return decoded
     return {"value": decoded}
 
 
-_ALLOWED_JOB_TRANSITIONS: dict[JobStatus, set[JobStatus]] = {
-    JobStatus.QUEUED: {JobStatus.RUNNING},
-    JobStatus.RUNNING: {JobStatus.COMPLETED, JobStatus.FAILED},
-    JobStatus.COMPLETED: set(),
-    JobStatus.FAILED: set(),
-    JobStatus.CANCELLED: set(),
+# WAL lets heartbeat writes proceed without blocking node/job reads.
+_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, _connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in _SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+DocumentT = TypeVar("DocumentT", bound=BaseModel)
+
+
+def _cached_document(
+    cache: dict[str, tuple[dict[str, object], DocumentT]],
+    node_id: str,
+    raw: dict[str, object],
+    model: type[DocumentT],
+) -> DocumentT:
+    # Capabilities/policy rarely change; reuse the parsed model while the stored
+    # document is unchanged. Comparing the decoded dicts is far cheaper than
+    # re-validating them, and both models are frozen so sharing is safe. One
+    # entry per node, replaced whenever its document changes.
+    cached = cache.get(node_id)
+    if cached is not None and cached[0] == raw:
+        return cached[1]
+    document = model.model_validate(raw)
+    cache[node_id] = (raw, document)
+    return document
+
+
+# Rows fetched per batch when streaming list endpoints.
+_LIST_BATCH_SIZE = 500
+
+# Derived Job counters for a job whose tasks were all just queued.
+_NEW_JOB_STATS: dict[str, object] = {
+    "running_tasks": 0,
+    "completed_tasks": 0,
+    "failed_tasks": 0,
+    "total_retries": 0,
+    "avg_task_duration_ms": None,
+    "throughput_tasks_per_minute": None,
 }
 
+_NODES_STATEMENT = (
+    select(NodeRecord)
+    .order_by(NodeRecord.node_id.asc())
+    .execution_options(yield_per=_LIST_BATCH_SIZE)
+)
+
+
+def _job_filters(
+    by_status: bool, by_type: bool, by_node: bool
+) -> list[ColumnElement[bool]]:
+    filters: list[ColumnElement[bool]] = []
+    if by_status:
+        filters.append(JobRecord.status == bindparam("status"))
+    if by_type:
+        filters.append(JobRecord.type == bindparam("task_type"))
+    if by_node:
+        task_subquery = select(TaskRecord.job_id).where(
+            TaskRecord.assigned_node_id == bindparam("node_id")
+        )
+        filters.append(
+            or_(
+                JobRecord.assigned_node_id == bindparam("node_id"),
+                JobRecord.id.in_(task_subquery),
+            )
+        )
+    return filters
+
+
+def _job_params(
+    status: JobStatus | None, task_type: TaskType | None, node_id: str | None
+) -> dict[str, str]:
+    params: dict[str, str] = {}
+    if status is not None:
+        params["status"] = status.value
+    if task_type is not None:
+        params["task_type"] = task_type.value
+    if node_id is not None:
+        params["node_id"] = node_id
+    return params
+
+
+@lru_cache(maxsize=8)
+def _jobs_statement(
+    by_status: bool, by_type: bool, by_node: bool
+) -> Select[tuple[JobRecord]]:
+    """Prebuilt job listing per filter combination; values bind at execute time."""
+
+    return (
+        select(JobRecord)
+        .where(*_job_filters(by_status, by_type, by_node))
+        .order_by(JobRecord.created_at.desc(), JobRecord.id.asc())
+        .execution_options(yield_per=_LIST_BATCH_SIZE)
+    )
+
+
+@lru_cache(maxsize=8)
+def _job_count_statement(
+    by_status: bool, by_type: bool, by_node: bool
+) -> Select[tuple[int]]:
+    return (
+        select(func.count())
+        .select_from(JobRecord)
+        .where(*_job_filters(by_status, by_type, by_node))
+    )
+
+
+# Stored status strings, hoisted so hot paths skip enum attribute lookups.
+_NODE_OFFLINE = NodeStatus.OFFLINE.value
+_NODE_ONLINE = NodeStatus.ONLINE.value
+_NODE_UNKNOWN = NodeStatus.UNKNOWN.value
+_JOB_COMPLETED = JobStatus.COMPLETED.value
+_JOB_FAILED = JobStatus.FAILED.value
+_JOB_QUEUED = JobStatus.QUEUED.value
+_JOB_RUNNING = JobStatus.RUNNING.value
+_TASK_COMPLETED = TaskStatus.COMPLETED.value
+_TASK_FAILED = TaskStatus.FAILED.value
+_TASK_QUEUED = TaskStatus.QUEUED.value
+_TASK_RUNNING = TaskStatus.RUNNING.value
+_TASK_ACTIVE = frozenset({_TASK_QUEUED, _TASK_RUNNING})
+
+# (current, new) pairs of stored status strings. JobStatus is a StrEnum, so
+# members hash and compare equal to the raw column values.
+_ALLOWED_JOB_TRANSITIONS: frozenset[tuple[str, str]] = frozenset(
+    {
+        (_JOB_QUEUED, _JOB_RUNNING),
+        (_JOB_RUNNING, _JOB_COMPLETED),
+        (_JOB_RUNNING, _JOB_FAILED),
+    }
+)
+
 
 class CoordinatorRepository:
-    def __init__(self, db_url: str) -> None:
-        apply_migrations(db_url)
+    def __init__(self, db_url: str, pool_size: int = 5) -> None:
+        in_memory = is_memory_url(db_url)
+        if not in_memory:
+            apply_migrations(db_url)
+        # An in-memory database lives and dies with its one connection, which is
+        # then shared unsynchronized across threads: test use only.
+        pool_options: dict[str, object] = (
+            {"poolclass": StaticPool} if in_memory else {"pool_size": pool_size}
+        )
         self._engine = create_engine(
             db_url,
             future=True,
             connect_args={"check_same_thread": False},
+            json_serializer=_json_serializer,
+            json_deserializer=orjson.loads,
+            query_cache_size=1200,
+            **pool_options,
         )
+        event.listen(self._engine, "connect", _apply_sqlite_pragmas)
+        if in_memory:
+            with self._engine.connect() as connection:
+                copy_migrated_schema(connection.connection.driver_connection)
         self._session_factory = sessionmaker(
             bind=self._engine, autoflush=False, expire_on_commit=False
         )
+        self._heartbeats = HeartbeatCoalescer()
+        self._flush_lock = Lock()
+        self._capabilities_cache: dict[
+            str, tuple[dict[str, object], NodeCapabilities]
+        ] = {}
+        self._policy_cache: dict[str, tuple[dict[str, object], NodePolicy]] = {}
+        # Same for every first-contact node (only heartbeat_ts varies); never
+        # mutated in place, so rows can share them.
+        self._default_capabilities_json = NodeCapabilities().model_dump(mode="json")
+        self._default_metrics_json = NodeMetrics().model_dump(mode="json")
+        self._default_policy_json = NodePolicy().model_dump(mode="json")
+        # Dialect insert() supports ON CONFLICT; the migrations only target SQLite.
+        self._upsert = (
+            postgresql.insert
+            if self._engine.dialect.name == "postgresql"
+            else sqlite.insert
+        )
 
-    def _default_capabilities(self) -> NodeCapabilities:
-        return NodeCapabilities()
-
-    def _default_metrics(self) -> NodeMetrics:
-        return NodeMetrics()
-
-    def _default_policy(self) -> NodePolicy:
-        return NodePolicy()
+    def _default_node_row(self, node_id: str, now: datetime) -> dict[str, object]:
+        return {
+            "node_id": node_id,
+            "display_name": node_id,
+            "ip": "0.0.0.0",
+            "port": 0,
+            "status": _NODE_UNKNOWN,
+            "capabilities_json": self._default_capabilities_json,
+            "metrics_json": {
+                **self._default_metrics_json,
+                "heartbeat_ts": now.isoformat(),
+            },
+            "policy_json": self._default_policy_json,
+            "last_seen": now,
+            "created_at": now,
+            "updated_at": now,
+        }
 
-    def _ensure_node(self, session: Session, node_id: str) -> NodeRecord:
-        node = session.get(NodeRecord, node_id)
-        if node is not None:
-            return node
+    def _upsert_node(
+        self, session: Session, node_id: str, now: datetime, **values: object
+    ) -> NodeRecord:
+        """Create the node with defaults or update `values`, in one statement."""
 
-        now = _utc_now()
-        node = NodeRecord(
-            node_id=node_id,
-            display_name=node_id,
-            ip="0.0.0.0",
-            port=0,
-            status=NodeStatus.UNKNOWN.value,
-            capabilities_json=_encode_json(
-                self._default_capabilities().model_dump(mode="json")
-            ),
-            metrics_json=_encode_json(self._default_metrics().model_dump(mode="json")),
-            policy_json=_encode_json(self._default_policy().model_dump(mode="json")),
-            last_seen=now,
-            created_at=now,
-            updated_at=now,
+        values["updated_at"] = now
+        stmt = (
+            self._upsert(NodeRecord)
+            .values({**self._default_node_row(node_id, now), **values})
+            .on_conflict_do_update(index_elements=[NodeRecord.node_id], set_=values)
+            .returning(NodeRecord)
         )
-        session.add(node)
-        session.flush()
-        return node
+        return session.scalars(stmt).one()
 
     def _to_node(self, row: NodeRecord) -> Node:
-        identity = NodeIdentity(
+        # Rows were validated on write. Only the JSON documents need coercion
+        # back to enums/datetimes; the outer models are built unvalidated.
+        identity = NodeIdentity.model_construct(
             node_id=row.node_id,
             display_name=row.display_name,
             ip=row.ip,
             port=row.port,
         )
-        capabilities = NodeCapabilities.model_validate(
-            _decode_json(row.capabilities_json)
+        capabilities = _cached_document(
+            self._capabilities_cache,
+            row.node_id,
+            row.capabilities_json,
+            NodeCapabilities,
+        )
+        policy = _cached_document(
+            self._policy_cache, row.node_id, row.policy_json, NodePolicy
         )
-        metrics = NodeMetrics.model_validate(_decode_json(row.metrics_json))
-        policy = NodePolicy.model_validate(_decode_json(row.policy_json))
 
-        return Node(
+        # Heartbeats not yet flushed to the database are newer than the row.
+        pending = self._heartbeats.get(row.node_id)
+        if pending is not None:
+            return Node.model_construct(
+                identity=identity,
+                capabilities=capabilities,
+                metrics=pending.metrics,
+                policy=policy,
+                status=NodeStatus.ONLINE,
+                last_seen=pending.metrics.heartbeat_ts,
+                created_at=row.created_at,
+                updated_at=pending.received_at,
+            )
+
+        metrics = NodeMetrics.model_validate(row.metrics_json)
+        return Node.model_construct(
             identity=identity,
             capabilities=capabilities,
             metrics=metrics,
             policy=policy,
             status=NodeStatus(row.status),
-            last_seen=_as_utc(row.last_seen) or _utc_now(),
-            created_at=_as_utc(row.created_at) or _utc_now(),
-            updated_at=_as_utc(row.updated_at) or _utc_now(),
+            last_seen=row.last_seen,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
         )
 
     def _task_rows_for_job(self, session: Session, job_id: str) -> list[TaskRecord]:
@@ -150,18 +352,10 @@ class CoordinatorRepository:
         result_rows = self._task_result_rows_for_job(session, job_id)
 
         total_tasks = len(task_rows)
-        queued_tasks = sum(
-            1 for row in task_rows if row.status == TaskStatus.QUEUED.value
-        )
-        running_tasks = sum(
-            1 for row in task_rows if row.status == TaskStatus.RUNNING.value
-        )
-        completed_tasks = sum(
-            1 for row in task_rows if row.status == TaskStatus.COMPLETED.value
-        )
-        failed_tasks = sum(
-            1 for row in task_rows if row.status == TaskStatus.FAILED.value
-        )
+        queued_tasks = sum(1 for row in task_rows if row.status == _TASK_QUEUED)
+        running_tasks = sum(1 for row in task_rows if row.status == _TASK_RUNNING)
+        completed_tasks = sum(1 for row in task_rows if row.status == _TASK_COMPLETED)
+        failed_tasks = sum(1 for row in task_rows if row.status == _TASK_FAILED)
         total_retries = sum(row.retries for row in task_rows)
 
         assigned_nodes = sorted(
@@ -180,9 +374,7 @@ class CoordinatorRepository:
 
         throughput_tasks_per_minute: float | None = None
         started_candidates = [
-            _as_utc(row.started_at)
-            for row in task_rows
-            if _as_utc(row.started_at) is not None
+            row.started_at for row in task_rows if row.started_at is not None
         ]
         if completed_tasks > 0 and started_candidates:
             earliest_started = min(started_candidates)
@@ -237,14 +429,10 @@ class CoordinatorRepository:
 
         task_rows = self._task_rows_for_job(session, job_id)
         started_values = [
-            _as_utc(item.started_at)
-            for item in task_rows
-            if _as_utc(item.started_at) is not None
+            item.started_at for item in task_rows if item.started_at is not None
         ]
         completed_values = [
-            _as_utc(item.completed_at)
-            for item in task_rows
-            if _as_utc(item.completed_at) is not None
+            item.completed_at for item in task_rows if item.completed_at is not None
         ]
 
         if started_values and row.started_at is None:
@@ -266,17 +454,17 @@ class CoordinatorRepository:
     def _to_job(self, session: Session, row: JobRecord) -> Job:
         stats = self._job_stats(session, row.id)
 
-        return Job(
+        return Job.model_construct(
             id=row.id,
             type=TaskType(row.type),
             status=JobStatus(row.status),
             payload_ref=row.payload_ref,
             assigned_node_id=row.assigned_node_id,
             attempts=row.attempts,
-            created_at=_as_utc(row.created_at) or _utc_now(),
-            updated_at=_as_utc(row.updated_at) or _utc_now(),
-            started_at=_as_utc(row.started_at),
-            completed_at=_as_utc(row.completed_at),
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            started_at=row.started_at,
+            completed_at=row.completed_at,
             error=row.error,
             total_tasks=int(stats["total_tasks"]),
             queued_tasks=int(stats["queued_tasks"]),
@@ -298,7 +486,7 @@ class CoordinatorRepository:
         )
 
     def _to_task(self, row: TaskRecord) -> Task:
-        return Task(
+        return Task.model_construct(
             id=row.id,
             job_id=row.job_id,
             type=TaskType(row.type),
@@ -307,11 +495,11 @@ class CoordinatorRepository:
             assigned_node_id=row.assigned_node_id,
             retries=row.retries,
             max_retries=row.max_retries,
-            lease_expires_at=_as_utc(row.lease_expires_at),
-            created_at=_as_utc(row.created_at) or _utc_now(),
-            updated_at=_as_utc(row.updated_at) or _utc_now(),
-            started_at=_as_utc(row.started_at),
-            completed_at=_as_utc(row.completed_at),
+            lease_expires_at=row.lease_expires_at,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            started_at=row.started_at,
+            completed_at=row.completed_at,
             error=row.error,
         )
 
@@ -320,12 +508,34 @@ class CoordinatorRepository:
     ) -> Node:
         now = _utc_now()
         with self._session_factory.begin() as session:
-            node = self._ensure_node(session, node_id)
-            node.display_name = display_name
-            node.ip = ip
-            node.port = port
-            node.updated_at = now
-            session.flush()
+            node = self._upsert_node(
+                session, node_id, now, display_name=display_name, ip=ip, port=port
+            )
+            return self._to_node(node)
+
+    def register_node(
+        self,
+        node_id: str,
+        display_name: str,
+        ip: str,
+        port: int,
+        capabilities: NodeCapabilities | dict[str, object],
+    ) -> Node:
+        """Upsert identity and capabilities for a registering node in one transaction."""
+
+        now = _utc_now()
+        payload = NodeCapabilities.model_validate(capabilities)
+
+        with self._session_factory.begin() as session:
+            node = self._upsert_node(
+                session,
+                node_id,
+                now,
+                display_name=display_name,
+                ip=ip,
+                port=port,
+                capabilities_json=payload.model_dump(mode="json"),
+            )
             return self._to_node(node)
 
     def upsert_node_capabilities(
@@ -335,10 +545,12 @@ class CoordinatorRepository:
         payload = NodeCapabilities.model_validate(capabilities)
 
         with self._session_factory.begin() as session:
-            node = self._ensure_node(session, node_id)
-            node.capabilities_json = _encode_json(payload.model_dump(mode="json"))
-            node.updated_at = now
-            session.flush()
+            node = self._upsert_node(
+                session,
+                node_id,
+                now,
+                capabilities_json=payload.model_dump(mode="json"),
+            )
             return self._to_node(node)
 
     def update_node_metrics(
@@ -346,22 +558,103 @@ class CoordinatorRepository:
     ) -> Node:
         now = _utc_now()
         payload = NodeMetrics.model_validate(metrics)
+        # This direct write supersedes any heartbeat still waiting for a flush.
+        self._heartbeats.discard(node_id)
 
         with self._session_factory.begin() as session:
-            node = self._ensure_node(session, node_id)
-            node.metrics_json = _encode_json(payload.model_dump(mode="json"))
-            node.status = NodeStatus.ONLINE.value
-            node.last_seen = payload.heartbeat_ts
-            node.updated_at = now
-            session.flush()
+            node = self._upsert_node(
+                session,
+                node_id,
+                now,
+                metrics_json=payload.model_dump(mode="json"),
+                status=_NODE_ONLINE,
+                last_seen=payload.heartbeat_ts,
+            )
             return self._to_node(node)
 
+    def queue_node_metrics(
+        self, node_id: str, metrics: NodeMetrics | dict[str, object]
+    ) -> NodeMetrics:
+        """Record a heartbeat in memory; `flush_node_metrics` persists it later."""
+
+        payload = NodeMetrics.model_validate(metrics)
+        self._heartbeats.put(node_id, payload, _utc_now())
+        return payload
+
+    def flush_node_metrics(self) -> int:
+        """Write the latest queued heartbeat per node in one transaction.
+
+        Flushes are serialized so an older batch never commits over a newer one.
+        Queued entries keep overlaying reads until their commit lands; on failure
+        they simply stay queued and the error propagates.
+        """
+
+        with self._flush_lock:
+            pending = self._heartbeats.snapshot()
+            if not pending:
+                return 0
+
+            now = _utc_now()
+            stmt = self._upsert(NodeRecord)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[NodeRecord.node_id],
+                set_={
+                    name: stmt.excluded[name]
+                    for name in ("metrics_json", "status", "last_seen", "updated_at")
+                },
+            )
+            with self._session_factory.begin() as session:
+                session.execute(
+                    stmt,
+                    [
+                        {
+                            **self._default_node_row(node_id, now),
+                            "metrics_json": item.metrics.model_dump(mode="json"),
+                            "status": _NODE_ONLINE,
+                            "last_seen": item.metrics.heartbeat_ts,
+                            "updated_at": item.received_at,
+                        }
+                        for node_id, item in pending.items()
+                    ],
+                )
+            self._heartbeats.remove_flushed(pending)
+
+        return len(pending)
+
+    def iter_nodes(self) -> Iterator[Node]:
+        with self._session_factory() as session:
+            for row in session.scalars(_NODES_STATEMENT):
+                yield self._to_node(row)
+
     def get_nodes(self) -> list[Node]:
+        return list(self.iter_nodes())
+
+    def list_eligible_nodes(self, task_type: TaskType) -> list[Node]:
+        """Nodes that may run `task_type`, prefiltered in SQL on the JSON documents.
+
+        Status, policy enablement and CPU/RAM caps are checked by the database;
+        the remaining rules (allowlist, GPU) run on the few rows that pass.
+        """
+
+        # Pending heartbeats carry the status/metrics the filter compares.
+        self.flush_node_metrics()
+        metrics = NodeRecord.metrics_json
+        policy = NodeRecord.policy_json
+        stmt = (
+            select(NodeRecord)
+            .where(
+                NodeRecord.status == _NODE_ONLINE,
+                policy["enabled"].as_boolean(),
+                metrics["cpu_percent"].as_float()
+                <= policy["cpu_cap_percent"].as_float(),
+                metrics["ram_percent"].as_float()
+                <= policy["ram_cap_percent"].as_float(),
+            )
+            .order_by(NodeRecord.node_id.asc())
+        )
         with self._session_factory() as session:
-            rows = session.scalars(
-                select(NodeRecord).order_by(NodeRecord.node_id.asc())
-            ).all()
-            return [self._to_node(row) for row in rows]
+            nodes = [self._to_node(row) for row in session.scalars(stmt)]
+        return [node for node in nodes if evaluate_node_eligibility(node, task_type)[0]]
 
     def get_node(self, node_id: str) -> Node | None:
         with self._session_factory() as session:
@@ -377,79 +670,151 @@ class CoordinatorRepository:
         payload = NodePolicy.model_validate(policy)
 
         with self._session_factory.begin() as session:
-            node = self._ensure_node(session, node_id)
-            node.policy_json = _encode_json(payload.model_dump(mode="json"))
-            node.updated_at = now
-            session.flush()
+            node = self._upsert_node(
+                session, node_id, now, policy_json=payload.model_dump(mode="json")
+            )
             return self._to_node(node)
 
     def mark_offline_if_stale_nodes(self, stale_seconds: int) -> list[Node]:
+        self.flush_node_metrics()
         now = _utc_now()
         cutoff = now - timedelta(seconds=stale_seconds)
-        updated_nodes: list[Node] = []
 
+        stmt = (
+            update(NodeRecord)
+            .where(
+                NodeRecord.last_seen < cutoff,
+                NodeRecord.status != _NODE_OFFLINE,
+            )
+            .values(status=_NODE_OFFLINE, updated_at=now)
+            .returning(NodeRecord)
+        )
         with self._session_factory.begin() as session:
-            rows = session.scalars(select(NodeRecord)).all()
-            for node in rows:
-                if (
-                    _as_utc(node.last_seen) or now
-                ) < cutoff and node.status != NodeStatus.OFFLINE.value:
-                    node.status = NodeStatus.OFFLINE.value
-                    node.updated_at = now
-                    session.flush()
-                    updated_nodes.append(self._to_node(node))
-
-        return updated_nodes
+            rows = session.scalars(
+                stmt, execution_options={"synchronize_session": False}
+            ).all()
+            return [self._to_node(row) for row in rows]
 
     def mark_offline_if_stale(self, stale_seconds: int) -> int:
         return len(self.mark_offline_if_stale_nodes(stale_seconds=stale_seconds))
 
     def create_job(self, job: Job | dict[str, object]) -> Job:
-        payload = Job.model_validate(job)
-        with self._session_factory.begin() as session:
-            row = JobRecord(
-                id=payload.id,
-                type=payload.type.value,
-                status=payload.status.value,
-                payload_ref=payload.payload_ref,
-                assigned_node_id=payload.assigned_node_id,
-                attempts=payload.attempts,
-                created_at=payload.created_at,
-                updated_at=payload.updated_at,
-                started_at=payload.started_at,
-                completed_at=payload.completed_at,
-                error=payload.error,
-            )
-            session.add(row)
-            session.flush()
-            return self._to_job(session, row)
+        return self.create_jobs_bulk([Job.model_validate(job)], [[]])[0]
 
-    def list_jobs(
+    def create_jobs_bulk(
         self,
-        status: JobStatus | None = None,
-        task_type: TaskType | None = None,
-        node_id: str | None = None,
+        jobs: list[Job],
+        task_payloads: list[list[dict[str, object]]],
+        max_retries: int | list[int] = 2,
     ) -> list[Job]:
-        stmt = select(JobRecord)
-        if status is not None:
-            stmt = stmt.where(JobRecord.status == status.value)
-        if task_type is not None:
-            stmt = stmt.where(JobRecord.type == task_type.value)
-        if node_id is not None:
-            task_subquery = select(TaskRecord.job_id).where(
-                TaskRecord.assigned_node_id == node_id
+        """Insert jobs and their queued tasks in a single transaction.
+
+        `task_payloads[i]` holds the task payloads for `jobs[i]`, and
+        `max_retries` is either shared by every job or given per job. Job counters
+        are derived in memory since every task starts out QUEUED; any counters set
+        on the incoming models are ignored.
+        """
+
+        if len(jobs) != len(task_payloads):
+            raise ValueError("jobs and task_payloads must have the same length")
+        if isinstance(max_retries, int):
+            max_retries = [max_retries] * len(jobs)
+        elif len(max_retries) != len(jobs):
+            raise ValueError("jobs and max_retries must have the same length")
+
+        now = _utc_now()
+        job_rows: list[dict[str, object]] = []
+        task_rows: list[dict[str, object]] = []
+        created: list[Job] = []
+
+        for job, payloads, job_max_retries in zip(jobs, task_payloads, max_retries):
+            job_rows.append(
+                {
+                    "id": job.id,
+                    "type": job.type.value,
+                    "status": job.status.value,
+                    "payload_ref": job.payload_ref,
+                    "assigned_node_id": job.assigned_node_id,
+                    "attempts": job.attempts,
+                    "created_at": job.created_at,
+                    "updated_at": job.updated_at,
+                    "started_at": job.started_at,
+                    "completed_at": job.completed_at,
+                    "error": job.error,
+                }
             )
-            stmt = stmt.where(
-                or_(
-                    JobRecord.assigned_node_id == node_id,
-                    JobRecord.id.in_(task_subquery),
+            for payload in payloads:
+                task_rows.append(
+                    {
+                        "id": f"task-{uuid.uuid4().hex[:12]}",
+                        "job_id": job.id,
+                        "type": job.type.value,
+                        "payload_json": _encode_json(payload),
+                        "status": _TASK_QUEUED,
+                        "assigned_node_id": None,
+                        "retries": 0,
+                        "max_retries": job_max_retries,
+                        "lease_expires_at": None,
+                        "created_at": now,
+                        "updated_at": now,
+                        "started_at": None,
+                        "completed_at": None,
+                        "error": None,
+                    }
+                )
+            created.append(
+                job.model_copy(
+                    update={
+                        **_NEW_JOB_STATS,
+                        "assigned_nodes": [],
+                        "total_tasks": len(payloads),
+                        "queued_tasks": len(payloads),
+                    }
                 )
             )
-        stmt = stmt.order_by(JobRecord.created_at.desc(), JobRecord.id.asc())
+
+        with self._session_factory.begin() as session:
+            if job_rows:
+                session.execute(insert(JobRecord), job_rows)
+            if task_rows:
+                session.execute(insert(TaskRecord), task_rows)
+
+        return created
+
+    def iter_jobs(
+        self,
+        status: JobStatus | None = None,
+        task_type: TaskType | None = None,
+        node_id: str | None = None,
+    ) -> Iterator[Job]:
+        stmt = _jobs_statement(
+            status is not None, task_type is not None, node_id is not None
+        )
+        params = _job_params(status, task_type, node_id)
 
         with self._session_factory() as session:
-            rows = session.scalars(stmt).all()
-            return [self._to_job(session, row) for row in rows]
+            for row in session.scalars(stmt, params):
+                yield self._to_job(session, row)
+
+    def count_jobs(
+        self,
+        status: JobStatus | None = None,
+        task_type: TaskType | None = None,
+        node_id: str | None = None,
+    ) -> int:
+        stmt = _job_count_statement(
+            status is not None, task_type is not None, node_id is not None
+        )
+        with self._session_factory() as session:
+            return session.scalar(stmt, _job_params(status, task_type, node_id)) or 0
+
+    def list_jobs(
+        self,
+        status: JobStatus | None = None,
+        task_type: TaskType | None = None,
+        node_id: str | None = None,
+    ) -> list[Job]:
+        return list(self.iter_jobs(status=status, task_type=task_type, node_id=node_id))
 
     def get_job(self, job_id: str) -> Job | None:
         with self._session_factory() as session:
@@ -466,7 +831,6 @@ class CoordinatorRepository:
                 raise KeyError(job_id)
             row.assigned_node_id = node_id
             row.updated_at = now
-            session.flush()
             return self._to_job(session, row)
 
     def transition_job_status(
@@ -479,17 +843,16 @@ class CoordinatorRepository:
             if row is None:
                 raise KeyError(job_id)
 
-            current_status = JobStatus(row.status)
+            current_status = row.status
             if current_status == new_status:
                 if error is not None:
                     row.error = error
                     row.updated_at = now
-                    session.flush()
                 return self._to_job(session, row)
 
-            if new_status not in _ALLOWED_JOB_TRANSITIONS[current_status]:
+            if (current_status, new_status) not in _ALLOWED_JOB_TRANSITIONS:
                 raise ValueError(
-                    f"Invalid transition from {current_status.value} to {new_status.value}"
+                    f"Invalid transition from {current_status} to {new_status.value}"
                 )
 
             row.status = new_status.value
@@ -506,7 +869,6 @@ class CoordinatorRepository:
                 row.completed_at = now
                 row.error = error or row.error or "Job failed"
 
-            session.flush()
             return self._to_job(session, row)
 
     def create_tasks(
@@ -529,7 +891,7 @@ class CoordinatorRepository:
                     job_id=job_id,
                     type=task_type.value,
                     payload_json=_encode_json(payload),
-                    status=TaskStatus.QUEUED.value,
+                    status=_TASK_QUEUED,
                     assigned_node_id=None,
                     retries=0,
                     max_retries=max_retries,
@@ -541,9 +903,10 @@ class CoordinatorRepository:
                     error=None,
                 )
                 session.add(row)
-                session.flush()
                 created.append(self._to_task(row))
 
+            # autoflush is off; the job refresh below counts these tasks.
+            session.flush()
             self._refresh_job_state_locked(session, job_id)
             return created
 
@@ -587,7 +950,7 @@ class CoordinatorRepository:
 
             queued_rows = session.scalars(
                 select(TaskRecord)
-                .where(TaskRecord.status == TaskStatus.QUEUED.value)
+                .where(TaskRecord.status == _TASK_QUEUED)
                 .order_by(TaskRecord.created_at.asc())
             ).all()
 
@@ -601,9 +964,7 @@ class CoordinatorRepository:
                     continue
 
                 score = score_node(node, task_type)
-                age_bonus = max(
-                    (now - (_as_utc(row.created_at) or now)).total_seconds() / 30.0, 0.0
-                )
+                age_bonus = max((now - row.created_at).total_seconds() / 30.0, 0.0)
                 weighted_score = score + age_bonus
 
                 if (
@@ -617,7 +978,7 @@ class CoordinatorRepository:
             if selected_row is None:
                 return None
 
-            selected_row.status = TaskStatus.RUNNING.value
+            selected_row.status = _TASK_RUNNING
             selected_row.assigned_node_id = node_id
             selected_row.lease_expires_at = lease_expires_at
             selected_row.started_at = selected_row.started_at or now
@@ -625,7 +986,7 @@ class CoordinatorRepository:
 
             job_row = session.get(JobRecord, selected_row.job_id)
             if job_row is not None:
-                job_row.status = JobStatus.RUNNING.value
+                job_row.status = _JOB_RUNNING
                 job_row.assigned_node_id = node_id
                 job_row.started_at = job_row.started_at or now
                 job_row.updated_at = now
@@ -639,7 +1000,7 @@ class CoordinatorRepository:
     ) -> list[TaskRecord]:
         stale_rows = session.scalars(
             select(TaskRecord).where(
-                TaskRecord.status == TaskStatus.RUNNING.value,
+                TaskRecord.status == _TASK_RUNNING,
                 TaskRecord.lease_expires_at.is_not(None),
                 TaskRecord.lease_expires_at < now,
             )
@@ -653,10 +1014,10 @@ class CoordinatorRepository:
             row.error = "Task lease expired"
 
             if row.retries > row.max_retries:
-                row.status = TaskStatus.FAILED.value
+                row.status = _TASK_FAILED
                 row.completed_at = now
             else:
-                row.status = TaskStatus.QUEUED.value
+                row.status = _TASK_QUEUED
                 row.assigned_node_id = None
 
             touched_jobs.add(row.job_id)
@@ -690,7 +1051,7 @@ class CoordinatorRepository:
                     f"Task '{payload.task_id}' assigned to {row.assigned_node_id}, not {payload.node_id}"
                 )
 
-            if row.status not in {TaskStatus.RUNNING.value, TaskStatus.QUEUED.value}:
+            if row.status not in _TASK_ACTIVE:
                 raise ValueError(
                     f"Task '{payload.task_id}' is not executable in status {row.status}"
                 )
@@ -709,17 +1070,17 @@ class CoordinatorRepository:
             row.updated_at = now
 
             if payload.success:
-                row.status = TaskStatus.COMPLETED.value
+                row.status = _TASK_COMPLETED
                 row.completed_at = now
                 row.error = None
             else:
                 row.retries += 1
                 if row.retries > row.max_retries:
-                    row.status = TaskStatus.FAILED.value
+                    row.status = _TASK_FAILED
                     row.completed_at = now
                     row.error = "Task failed after max retries"
                 else:
-                    row.status = TaskStatus.QUEUED.value
+                    row.status = _TASK_QUEUED
                     row.assigned_node_id = None
                     row.error = "Task execution failed; requeued"
 
@@ -785,15 +1146,16 @@ class CoordinatorRepository:
             }
 
     def close(self) -> None:
+        self.flush_node_metrics()
         self._engine.dispose()
 
 
 _default_repository: CoordinatorRepository | None = None
 
 
-def init_repository(db_url: str) -> CoordinatorRepository:
+def init_repository(db_url: str, pool_size: int = 5) -> CoordinatorRepository:
     global _default_repository
-    _default_repository = CoordinatorRepository(db_url=db_url)
+    _default_repository = CoordinatorRepository(db_url=db_url, pool_size=pool_size)
     return _default_repository
 
 
@@ -807,6 +1169,16 @@ def upsert_node_identity(node_id: str, display_name: str, ip: str, port: int) ->
     return get_repository().upsert_node_identity(node_id, display_name, ip, port)
 
 
+def register_node(
+    node_id: str,
+    display_name: str,
+    ip: str,
+    port: int,
+    capabilities: NodeCapabilities | dict[str, object],
+) -> Node:
+    return get_repository().register_node(node_id, display_name, ip, port, capabilities)
+
+
 def upsert_node_capabilities(
     node_id: str, capabilities: NodeCapabilities | dict[str, object]
 ) -> Node:
@@ -821,6 +1193,24 @@ def get_nodes() -> list[Node]:
     return get_repository().get_nodes()
 
 
+def queue_node_metrics(
+    node_id: str, metrics: NodeMetrics | dict[str, object]
+) -> NodeMetrics:
+    return get_repository().queue_node_metrics(node_id, metrics)
+
+
+def flush_node_metrics() -> int:
+    return get_repository().flush_node_metrics()
+
+
+def iter_nodes() -> Iterator[Node]:
+    return get_repository().iter_nodes()
+
+
+def list_eligible_nodes(task_type: TaskType) -> list[Node]:
+    return get_repository().list_eligible_nodes(task_type)
+
+
 def get_node(node_id: str) -> Node | None:
     return get_repository().get_node(node_id)
 
@@ -841,6 +1231,16 @@ def create_job(job: Job | dict[str, object]) -> Job:
     return get_repository().create_job(job)
 
 
+def create_jobs_bulk(
+    jobs: list[Job],
+    task_payloads: list[list[dict[str, object]]],
+    max_retries: int | list[int] = 2,
+) -> list[Job]:
+    return get_repository().create_jobs_bulk(
+        jobs=jobs, task_payloads=task_payloads, max_retries=max_retries
+    )
+
+
 def list_jobs(
     status: JobStatus | None = None,
     task_type: TaskType | None = None,
@@ -851,6 +1251,26 @@ def list_jobs(
     )
 
 
+def iter_jobs(
+    status: JobStatus | None = None,
+    task_type: TaskType | None = None,
+    node_id: str | None = None,
+) -> Iterator[Job]:
+    return get_repository().iter_jobs(
+        status=status, task_type=task_type, node_id=node_id
+    )
+
+
+def count_jobs(
+    status: JobStatus | None = None,
+    task_type: TaskType | None = None,
+    node_id: str | None = None,
+) -> int:
+    return get_repository().count_jobs(
+        status=status, task_type=task_type, node_id=node_id
+    )
+
+
 def get_job(job_id: str) -> Job | None:
     return get_repository().get_job(job_id)
 
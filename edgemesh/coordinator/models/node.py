@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 
-from pydantic import BaseModel, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from models.enums import NodeStatus, RolePreference, TaskType
 
@@ -17,6 +17,9 @@ class NodeIdentity(BaseModel):
 
 
 class NodeCapabilities(BaseModel):
+    # Frozen: the repository shares one parsed instance across every read.
+    model_config = ConfigDict(frozen=True)
+
     task_types: list[TaskType] = Field(default_factory=list)
     labels: list[str] = Field(default_factory=list)
     has_gpu: bool = False
@@ -29,15 +32,19 @@ class NodeCapabilities(BaseModel):
     os: str | None = None
     arch: str | None = None
 
-    @model_validator(mode="after")
-    def normalize(self) -> "NodeCapabilities":
-        if self.ram_total_gb is None and self.ram_gb is not None:
-            self.ram_total_gb = self.ram_gb
-        if self.ram_gb is None and self.ram_total_gb is not None:
-            self.ram_gb = self.ram_total_gb
-        if self.gpu_name or self.vram_total_gb is not None:
-            self.has_gpu = True
-        return self
+    @model_validator(mode="before")
+    @classmethod
+    def normalize(cls, data: object) -> object:
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        if data.get("ram_total_gb") is None and data.get("ram_gb") is not None:
+            data["ram_total_gb"] = data["ram_gb"]
+        if data.get("ram_gb") is None and data.get("ram_total_gb") is not None:
+            data["ram_gb"] = data["ram_total_gb"]
+        if data.get("gpu_name") or data.get("vram_total_gb") is not None:
+            data["has_gpu"] = True
+        return data
 
 
 class NodeMetrics(BaseModel):
@@ -52,6 +59,8 @@ class NodeMetrics(BaseModel):
 
 
 class NodePolicy(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     enabled: bool = True
     cpu_cap_percent: int = Field(default=100, ge=0, le=100)
     gpu_cap_percent: int | None = Field(default=None, ge=0, le=100)
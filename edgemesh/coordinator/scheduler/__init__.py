@@ -4,6 +4,7 @@ from scheduler.core import (
     evaluate_node_eligibility,
     is_node_eligible,
     score_node,
+    score_nodes_batch,
 )
 
 __all__ = [
@@ -12,4 +13,5 @@ __all__ = [
     "evaluate_node_eligibility",
     "is_node_eligible",
     "score_node",
+    "score_nodes_batch",
 ]
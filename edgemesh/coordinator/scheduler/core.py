@@ -1,4 +1,6 @@
+from collections.abc import Iterable
 from dataclasses import dataclass
+from functools import lru_cache
 
 from models import Node, NodeStatus, RolePreference, TaskType
 
@@ -12,62 +14,84 @@ class EffectiveCapacity:
 
 # Scoring weights for schedule simulation.
 # Higher is better: candidates with more headroom and better role/hardware affinity rank first.
-_SCORE_WEIGHTS = {
-    "cpu_headroom": 45.0,
-    "ram_headroom": 35.0,
-    "gpu_headroom": 20.0,
-    "infer_gpu_bonus": 22.0,
-    "cpu_task_cpu_node_bonus": 12.0,
-    "role_match_bonus": 14.0,
-    "role_mismatch_penalty": 10.0,
-    "running_jobs_penalty": 2.0,
-}
-
-
-def _task_requires_gpu(task_type: TaskType) -> bool:
-    return task_type == TaskType.INFERENCE
-
-
-def _task_prefers_cpu(task_type: TaskType) -> bool:
-    return task_type in {
-        TaskType.EMBEDDINGS,
-        TaskType.INDEX,
-        TaskType.TOKENIZE,
-        TaskType.PREPROCESS,
+_W_CPU_HEADROOM = 45.0
+_W_RAM_HEADROOM = 35.0
+_W_GPU_HEADROOM = 20.0
+_W_INFER_GPU_BONUS = 22.0
+_W_CPU_TASK_CPU_NODE_BONUS = 12.0
+_W_ROLE_MATCH_BONUS = 14.0
+_W_ROLE_MISMATCH_PENALTY = 10.0
+_W_RUNNING_JOBS_PENALTY = 2.0
+
+
+_INFER_ROLES = frozenset({RolePreference.AUTO, RolePreference.PREFER_INFERENCE})
+_CPU_ROLES = frozenset(
+    {
+        RolePreference.AUTO,
+        RolePreference.PREFER_EMBEDDINGS,
+        RolePreference.PREFER_PREPROCESS,
     }
+)
+_CPU_TASK_TYPES = frozenset(
+    {TaskType.EMBEDDINGS, TaskType.INDEX, TaskType.TOKENIZE, TaskType.PREPROCESS}
+)
 
 
-def _infer_role_match(role: RolePreference) -> bool:
-    return role in {RolePreference.AUTO, RolePreference.PREFER_INFERENCE}
+@dataclass(frozen=True, slots=True)
+class _TaskProfile:
+    requires_gpu: bool
+    prefers_cpu: bool
+    # Roles earning the match bonus; None when the task type has no role term.
+    role_matches: frozenset[RolePreference] | None
 
 
-def _cpu_role_match(role: RolePreference) -> bool:
-    return role in {
-        RolePreference.AUTO,
-        RolePreference.PREFER_EMBEDDINGS,
-        RolePreference.PREFER_PREPROCESS,
-    }
+def _build_task_profile(task_type: TaskType) -> _TaskProfile:
+    requires_gpu = task_type == TaskType.INFERENCE
+    prefers_cpu = task_type in _CPU_TASK_TYPES
+    role_matches = _INFER_ROLES if requires_gpu else None
+    if prefers_cpu:
+        role_matches = _CPU_ROLES
+    return _TaskProfile(requires_gpu, prefers_cpu, role_matches)
 
 
-def compute_effective_capacity(node: Node) -> EffectiveCapacity:
-    cpu_threads = node.capabilities.cpu_threads or node.capabilities.cpu_cores or 0
-    ram_total = node.capabilities.ram_total_gb or node.capabilities.ram_gb or 0.0
-    vram_total = node.capabilities.vram_total_gb
+_TASK_PROFILES: dict[TaskType, _TaskProfile] = {
+    task_type: _build_task_profile(task_type) for task_type in TaskType
+}
 
-    effective_cpu_threads = round(
-        cpu_threads * (node.policy.cpu_cap_percent / 100.0), 3
-    )
-    effective_ram_gb = round(ram_total * (node.policy.ram_cap_percent / 100.0), 3)
+
+@lru_cache(maxsize=4096)
+def _effective_capacity(
+    cpu_threads: int,
+    ram_total: float,
+    vram_total: float | None,
+    cpu_cap_percent: int,
+    gpu_cap_percent: int | None,
+    ram_cap_percent: int,
+) -> tuple[float, float, float | None]:
+    effective_cpu_threads = round(cpu_threads * (cpu_cap_percent / 100.0), 3)
+    effective_ram_gb = round(ram_total * (ram_cap_percent / 100.0), 3)
 
     effective_vram_gb: float | None = None
     if vram_total is not None:
-        gpu_cap = (
-            node.policy.gpu_cap_percent
-            if node.policy.gpu_cap_percent is not None
-            else 100
-        )
+        gpu_cap = gpu_cap_percent if gpu_cap_percent is not None else 100
         effective_vram_gb = round(vram_total * (gpu_cap / 100.0), 3)
 
+    return effective_cpu_threads, effective_ram_gb, effective_vram_gb
+
+
+def compute_effective_capacity(node: Node) -> EffectiveCapacity:
+    # Hardware and caps rarely change between cluster summary polls, so the
+    # math is memoized on those fields alone.
+    capabilities = node.capabilities
+    policy = node.policy
+    effective_cpu_threads, effective_ram_gb, effective_vram_gb = _effective_capacity(
+        capabilities.cpu_threads or capabilities.cpu_cores or 0,
+        capabilities.ram_total_gb or capabilities.ram_gb or 0.0,
+        capabilities.vram_total_gb,
+        policy.cpu_cap_percent,
+        policy.gpu_cap_percent,
+        policy.ram_cap_percent,
+    )
     return EffectiveCapacity(
         effective_cpu_threads=effective_cpu_threads,
         effective_ram_gb=effective_ram_gb,
@@ -92,7 +116,7 @@ def evaluate_node_eligibility(
     if node.metrics.ram_percent > node.policy.ram_cap_percent:
         reasons.append("ram_over_cap")
 
-    if _task_requires_gpu(task_type):
+    if _TASK_PROFILES[task_type].requires_gpu:
         if not node.capabilities.has_gpu:
             reasons.append("gpu_required")
         elif node.metrics.gpu_percent is not None:
@@ -118,46 +142,43 @@ def _headroom(percent: float, cap_percent: int) -> float:
     return max(0.0, 1.0 - utilization_ratio)
 
 
-def score_node(node: Node, task_type: TaskType) -> float:
-    score = 0.0
+def _score(node: Node, profile: _TaskProfile) -> float:
+    metrics = node.metrics
+    policy = node.policy
+    has_gpu = node.capabilities.has_gpu
 
-    score += (
-        _headroom(node.metrics.cpu_percent, node.policy.cpu_cap_percent)
-        * _SCORE_WEIGHTS["cpu_headroom"]
-    )
-    score += (
-        _headroom(node.metrics.ram_percent, node.policy.ram_cap_percent)
-        * _SCORE_WEIGHTS["ram_headroom"]
-    )
+    score = _headroom(metrics.cpu_percent, policy.cpu_cap_percent) * _W_CPU_HEADROOM
+    score += _headroom(metrics.ram_percent, policy.ram_cap_percent) * _W_RAM_HEADROOM
 
-    if _task_requires_gpu(task_type):
-        if node.capabilities.has_gpu:
-            score += _SCORE_WEIGHTS["infer_gpu_bonus"]
+    if profile.requires_gpu:
+        if has_gpu:
+            score += _W_INFER_GPU_BONUS
 
-        if node.metrics.gpu_percent is not None:
+        if metrics.gpu_percent is not None:
             gpu_cap = (
-                node.policy.gpu_cap_percent
-                if node.policy.gpu_cap_percent is not None
-                else 100
-            )
-            score += (
-                _headroom(node.metrics.gpu_percent, gpu_cap)
-                * _SCORE_WEIGHTS["gpu_headroom"]
+                policy.gpu_cap_percent if policy.gpu_cap_percent is not None else 100
             )
+            score += _headroom(metrics.gpu_percent, gpu_cap) * _W_GPU_HEADROOM
 
-        if _infer_role_match(node.policy.role_preference):
-            score += _SCORE_WEIGHTS["role_match_bonus"]
-        else:
-            score -= _SCORE_WEIGHTS["role_mismatch_penalty"]
-
-    if _task_prefers_cpu(task_type):
-        if not node.capabilities.has_gpu:
-            score += _SCORE_WEIGHTS["cpu_task_cpu_node_bonus"]
+    if profile.prefers_cpu and not has_gpu:
+        score += _W_CPU_TASK_CPU_NODE_BONUS
 
-        if _cpu_role_match(node.policy.role_preference):
-            score += _SCORE_WEIGHTS["role_match_bonus"]
+    if profile.role_matches is not None:
+        if policy.role_preference in profile.role_matches:
+            score += _W_ROLE_MATCH_BONUS
         else:
-            score -= _SCORE_WEIGHTS["role_mismatch_penalty"]
+            score -= _W_ROLE_MISMATCH_PENALTY
 
-    score -= node.metrics.running_jobs * _SCORE_WEIGHTS["running_jobs_penalty"]
+    score -= metrics.running_jobs * _W_RUNNING_JOBS_PENALTY
     return round(score, 3)
+
+
+def score_node(node: Node, task_type: TaskType) -> float:
+    return _score(node, _TASK_PROFILES[task_type])
+
+
+def score_nodes_batch(nodes: Iterable[Node], task_type: TaskType) -> list[float]:
+    """Score every node for one task type, looking up its task profile once."""
+
+    profile = _TASK_PROFILES[task_type]
+    return [_score(node, profile) for node in nodes]
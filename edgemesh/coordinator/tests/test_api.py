@@ -1,35 +1,96 @@
-import importlib
+from collections.abc import Iterator, Mapping
+from dataclasses import replace
+from functools import lru_cache
+from importlib.util import find_spec
+from types import MappingProxyType
 
+import orjson
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
+from db.orm import Base
+from db.repository import get_repository
+
+MEMORY_DB_URL = "sqlite:///:memory:"
 SHARED_SECRET = "test-shared-secret"
+# httpx merges request headers into its own copy; never mutate this.
+_AGENT_HEADERS = {"X-EdgeMesh-Secret": SHARED_SECRET}
+_AGENT_JSON_HEADERS = {**_AGENT_HEADERS, "content-type": "application/json"}
+
+_ALL_TASK_TYPES = ("INFERENCE", "EMBEDDINGS", "INDEX", "TOKENIZE", "PREPROCESS")
+_OPEN_POLICY: Mapping[str, object] = MappingProxyType(
+    {
+        "enabled": True,
+        "cpu_cap_percent": 100,
+        "gpu_cap_percent": 100,
+        "ram_cap_percent": 100,
+        "task_allowlist": _ALL_TASK_TYPES,
+        "role_preference": "AUTO",
+    }
+)
+_CAP_CPU: Mapping[str, object] = MappingProxyType(
+    {
+        "cpu_cores": 8,
+        "cpu_threads": 16,
+        "ram_total_gb": 32,
+        "os": "linux",
+        "arch": "x86_64",
+        "task_types": _ALL_TASK_TYPES,
+        "labels": ("inference",),
+    }
+)
+_CAP_GPU: Mapping[str, object] = MappingProxyType(
+    {
+        **_CAP_CPU,
+        "gpu_name": "NVIDIA L4",
+        "vram_total_gb": 24,
+        "labels": ("gpu", "inference"),
+    }
+)
+
+
+@pytest.fixture(scope="session")
+def app() -> FastAPI:
+    from coordinator_service.main import create_app
+    from coordinator_service.settings import Settings
+
+    settings = replace(
+        Settings.from_env(),
+        db_url=MEMORY_DB_URL,
+        node_stale_seconds=15,
+        edge_mesh_shared_secret=SHARED_SECRET,
+        # The in-memory database is one shared connection; keep the stale
+        # scans and heartbeat flusher off so only test requests touch it.
+        background_tasks_enabled=False,
+    )
+    return create_app(settings)
 
 
-@pytest.fixture()
-def client(
-    tmp_path: pytest.TempPathFactory, monkeypatch: pytest.MonkeyPatch
-) -> TestClient:
-    db_path = tmp_path / "api-test.db"
-    monkeypatch.setenv("COORDINATOR_DB_URL", f"sqlite:///{db_path}")
-    monkeypatch.setenv("NODE_STALE_SECONDS", "15")
-    monkeypatch.setenv("EDGE_MESH_SHARED_SECRET", SHARED_SECRET)
-
-    from coordinator_service import main as main_module
-
-    main_module = importlib.reload(main_module)
-    with TestClient(main_module.app) as test_client:
+@pytest.fixture(scope="session")
+def session_client(app: FastAPI) -> Iterator[TestClient]:
+    # uvloop ships with uvicorn[standard] except on Windows and PyPy.
+    backend_options = {"use_uvloop": find_spec("uvloop") is not None}
+    with TestClient(app, backend_options=backend_options) as test_client:
         yield test_client
 
 
-def _agent_headers() -> dict[str, str]:
-    return {"X-EdgeMesh-Secret": SHARED_SECRET}
+@pytest.fixture()
+def client(session_client: TestClient) -> TestClient:
+    # Empty the lifespan's repository in place so state never leaks between
+    # tests; rebinding it would swap the engine out under the running app.
+    repository = get_repository()
+    repository.flush_node_metrics()
+    with repository._session_factory.begin() as session:
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(table.delete())
+    return session_client
 
 
 def _register_agent_legacy(client: TestClient, agent_id: str = "agent-1") -> None:
     response = client.post(
         "/api/agents/register",
-        headers=_agent_headers(),
+        headers=_AGENT_HEADERS,
         json={
             "agent_id": agent_id,
             "capabilities": ["inference", "gpu"],
@@ -48,7 +109,7 @@ def _heartbeat_agent_legacy(
 ) -> None:
     response = client.post(
         f"/api/agents/{agent_id}/heartbeat",
-        headers=_agent_headers(),
+        headers=_AGENT_HEADERS,
         json={
             "status": "healthy",
             "metrics": {
@@ -62,37 +123,27 @@ def _heartbeat_agent_legacy(
     assert response.status_code == 202
 
 
+@lru_cache(maxsize=None)
+def _register_v1_body(node_id: str, has_gpu: bool) -> bytes:
+    # Node ids repeat across tests, so each body is encoded once per session.
+    return orjson.dumps(
+        {
+            "node_id": node_id,
+            "display_name": "Edge Node",
+            "ip": "10.0.0.5",
+            "port": 9100,
+            "capabilities": dict(_CAP_GPU if has_gpu else _CAP_CPU),
+        }
+    )
+
+
 def _register_agent_v1(
     client: TestClient, node_id: str = "node-1", has_gpu: bool = True
 ) -> None:
-    capabilities: dict[str, object] = {
-        "cpu_cores": 8,
-        "cpu_threads": 16,
-        "ram_total_gb": 32,
-        "os": "linux",
-        "arch": "x86_64",
-        "task_types": ["INFERENCE", "EMBEDDINGS", "INDEX", "TOKENIZE", "PREPROCESS"],
-        "labels": ["inference"],
-    }
-    if has_gpu:
-        capabilities.update(
-            {
-                "gpu_name": "NVIDIA L4",
-                "vram_total_gb": 24,
-                "labels": ["gpu", "inference"],
-            }
-        )
-
     response = client.post(
         "/v1/agent/register",
-        headers=_agent_headers(),
-        json={
-            "node_id": node_id,
-            "display_name": "Edge Node",
-            "ip": "10.0.0.5",
-            "port": 9100,
-            "capabilities": capabilities,
-        },
+        headers=_AGENT_JSON_HEADERS,
+        content=_register_v1_body(node_id, has_gpu),
     )
     assert response.status_code == 201
 
@@ -102,7 +153,7 @@ def _heartbeat_agent_v1(
 ) -> None:
     response = client.post(
         "/v1/agent/heartbeat",
-        headers=_agent_headers(),
+        headers=_AGENT_HEADERS,
         json={
             "node_id": node_id,
             "metrics": {
@@ -154,6 +205,32 @@ def test_register_and_heartbeat_flow_legacy(client: TestClient) -> None:
     assert rows[0]["is_stale"] is False
 
 
+def test_register_legacy_drops_invalid_numeric_metadata(client: TestClient) -> None:
+    response = client.post(
+        "/api/agents/register",
+        headers=_AGENT_HEADERS,
+        json={
+            "agent_id": "agent-odd",
+            "capabilities": ["inference"],
+            "metadata": {
+                "port": "-1",
+                "cpu_cores": "-1",
+                "cpu_threads": 8.7,
+                "ram_total_gb": -4,
+                "vram_total_gb": "12.5",
+            },
+        },
+    )
+    assert response.status_code == 201
+
+    node = client.get("/v1/nodes/agent-odd").json()["node"]
+    assert node["identity"]["port"] == 0
+    assert node["capabilities"]["cpu_cores"] is None
+    assert node["capabilities"]["cpu_threads"] is None
+    assert node["capabilities"]["ram_total_gb"] is None
+    assert node["capabilities"]["vram_total_gb"] == 12.5
+
+
 def test_v1_nodes_and_detail_with_history(client: TestClient) -> None:
     _register_agent_legacy(client)
     _heartbeat_agent_legacy(client)
@@ -213,22 +290,59 @@ def test_v1_agent_register_and_heartbeat(client: TestClient) -> None:
     assert nodes[0]["metrics"]["ram_used_gb"] == 7.8
 
 
-def test_schedule_ineligible_with_low_cpu_cap(client: TestClient) -> None:
-    _register_agent_v1(client, node_id="node-low-cap")
-    _heartbeat_agent_v1(client, node_id="node-low-cap", cpu_percent=9.0)
-
-    policy_response = client.put(
-        "/v1/nodes/node-low-cap/policy",
-        json={
-            "enabled": True,
-            "cpu_cap_percent": 1,
-            "gpu_cap_percent": 100,
-            "ram_cap_percent": 90,
-            "task_allowlist": ["INFERENCE", "EMBEDDINGS", "PREPROCESS"],
-            "role_preference": "AUTO",
-        },
-    )
-    assert policy_response.status_code == 200
+@pytest.mark.parametrize(
+    ("nodes", "expected_chosen", "expected_reason", "expected_candidates"),
+    [
+        pytest.param(
+            [
+                (
+                    "node-low-cap",
+                    True,
+                    {
+                        **_OPEN_POLICY,
+                        "cpu_cap_percent": 1,
+                        "ram_cap_percent": 90,
+                        "task_allowlist": ["INFERENCE", "EMBEDDINGS", "PREPROCESS"],
+                    },
+                )
+            ],
+            None,
+            "No eligible nodes found",
+            [("node-low-cap", False, ["cpu_over_cap"])],
+            id="ineligible-with-low-cpu-cap",
+        ),
+        pytest.param(
+            [
+                ("gpu-node", True, _OPEN_POLICY),
+                (
+                    "cpu-node",
+                    False,
+                    {
+                        **_OPEN_POLICY,
+                        "gpu_cap_percent": None,
+                        "role_preference": "PREFER_EMBEDDINGS",
+                    },
+                ),
+            ],
+            "gpu-node",
+            None,
+            [("gpu-node", True, []), ("cpu-node", False, ["gpu_required"])],
+            id="prefers-gpu-for-infer",
+        ),
+    ],
+)
+def test_simulate_schedule_infer(
+    client: TestClient,
+    nodes: list[tuple[str, bool, Mapping[str, object]]],
+    expected_chosen: str | None,
+    expected_reason: str | None,
+    expected_candidates: list[tuple[str, bool, list[str]]],
+) -> None:
+    for node_id, has_gpu, policy in nodes:
+        _register_agent_v1(client, node_id=node_id, has_gpu=has_gpu)
+        _heartbeat_agent_v1(client, node_id=node_id, cpu_percent=20.0)
+        policy_response = client.put(f"/v1/nodes/{node_id}/policy", json=dict(policy))
+        assert policy_response.status_code == 200
 
     schedule_response = client.post(
         "/v1/simulate/schedule", json={"task_type": "INFER"}
@@ -236,58 +350,12 @@ def test_schedule_ineligible_with_low_cpu_cap(client: TestClient) -> None:
     assert schedule_response.status_code == 200
 
     payload = schedule_response.json()
-    assert payload["chosen_node_id"] is None
-    assert payload["reason"] == "No eligible nodes found"
-    assert len(payload["ranked_candidates"]) == 1
-    assert payload["ranked_candidates"][0]["eligible"] is False
-    assert "cpu_over_cap" in payload["ranked_candidates"][0]["reasons"]
-
-
-def test_simulate_prefers_gpu_for_infer(client: TestClient) -> None:
-    _register_agent_v1(client, node_id="gpu-node", has_gpu=True)
-    _register_agent_v1(client, node_id="cpu-node", has_gpu=False)
-    _heartbeat_agent_v1(client, node_id="gpu-node", cpu_percent=20.0)
-    _heartbeat_agent_v1(client, node_id="cpu-node", cpu_percent=20.0)
-
-    client.put(
-        "/v1/nodes/gpu-node/policy",
-        json={
-            "enabled": True,
-            "cpu_cap_percent": 100,
-            "gpu_cap_percent": 100,
-            "ram_cap_percent": 100,
-            "task_allowlist": [
-                "INFERENCE",
-                "EMBEDDINGS",
-                "INDEX",
-                "TOKENIZE",
-                "PREPROCESS",
-            ],
-            "role_preference": "AUTO",
-        },
-    )
-    client.put(
-        "/v1/nodes/cpu-node/policy",
-        json={
-            "enabled": True,
-            "cpu_cap_percent": 100,
-            "gpu_cap_percent": None,
-            "ram_cap_percent": 100,
-            "task_allowlist": [
-                "INFERENCE",
-                "EMBEDDINGS",
-                "INDEX",
-                "TOKENIZE",
-                "PREPROCESS",
-            ],
-            "role_preference": "PREFER_EMBEDDINGS",
-        },
-    )
-
-    infer_response = client.post("/v1/simulate/schedule", json={"task_type": "INFER"})
-    assert infer_response.status_code == 200
-    infer_payload = infer_response.json()
-    assert infer_payload["chosen_node_id"] == "gpu-node"
+    assert payload["chosen_node_id"] == expected_chosen
+    assert payload["reason"] == expected_reason
+    assert [
+        (candidate["node_id"], candidate["eligible"], candidate["reasons"])
+        for candidate in payload["ranked_candidates"]
+    ] == expected_candidates
 
 
 def test_cluster_summary_updates_when_policy_changes(client: TestClient) -> None:
@@ -301,20 +369,7 @@ def test_cluster_summary_updates_when_policy_changes(client: TestClient) -> None
 
     policy_response = client.put(
         "/v1/nodes/node-summary/policy",
-        json={
-            "enabled": True,
-            "cpu_cap_percent": 50,
-            "gpu_cap_percent": 100,
-            "ram_cap_percent": 100,
-            "task_allowlist": [
-                "INFERENCE",
-                "EMBEDDINGS",
-                "INDEX",
-                "TOKENIZE",
-                "PREPROCESS",
-            ],
-            "role_preference": "AUTO",
-        },
+        json={**_OPEN_POLICY, "cpu_cap_percent": 50},
     )
     assert policy_response.status_code == 200
 
@@ -328,19 +383,18 @@ def test_jobs_crud_filters_and_transitions(client: TestClient) -> None:
     _register_agent_v1(client, node_id="jobs-node")
     _heartbeat_agent_v1(client, node_id="jobs-node", cpu_percent=18.0)
 
-    created_embed = client.post(
-        "/v1/jobs",
-        json={"task_type": "EMBED", "payload_ref": "demo://payload/embed-01"},
-    )
-    assert created_embed.status_code == 201
-    embed_job = created_embed.json()
-
-    created_infer = client.post(
-        "/v1/jobs",
-        json={"task_type": "INFER", "payload_ref": "demo://payload/infer-01"},
+    created = client.post(
+        "/v1/jobs/bulk",
+        json=[
+            {"task_type": "EMBED", "payload_ref": "demo://payload/embed-01"},
+            {"task_type": "INFER", "payload_ref": "demo://payload/infer-01"},
+        ],
     )
-    assert created_infer.status_code == 201
-    infer_job = created_infer.json()
+    assert created.status_code == 201
+    embed_job, infer_job = created.json()
+    assert embed_job["type"] == "EMBEDDINGS"
+    assert embed_job["total_tasks"] == 1
+    assert infer_job["type"] == "INFERENCE"
 
     list_all = client.get("/v1/jobs")
     assert list_all.status_code == 200
@@ -387,9 +441,12 @@ def test_demo_embed_burst_populates_jobs(client: TestClient) -> None:
     assert len(payload["jobs"]) == 6
     assert payload["assigned_count"] >= 1
 
-    list_response = client.get("/v1/jobs")
-    assert list_response.status_code == 200
-    assert len(list_response.json()) == 6
+    count_response = client.get("/v1/jobs/count")
+    assert count_response.status_code == 200
+    assert count_response.json() == {"count": 6}
+    assert client.get("/v1/jobs/count", params={"task_type": "INFER"}).json() == {
+        "count": 0
+    }
 
 
 def test_tasks_pull_submit_and_job_completion(client: TestClient) -> None:
@@ -411,7 +468,7 @@ def test_tasks_pull_submit_and_job_completion(client: TestClient) -> None:
 
     pull_one = client.post(
         "/v1/tasks/pull",
-        headers=_agent_headers(),
+        headers=_AGENT_HEADERS,
         json={"node_id": "worker-a"},
     )
     assert pull_one.status_code == 200
@@ -420,7 +477,7 @@ def test_tasks_pull_submit_and_job_completion(client: TestClient) -> None:
 
     result_one = client.post(
         f"/v1/tasks/{task_one['id']}/result",
-        headers=_agent_headers(),
+        headers=_AGENT_HEADERS,
         json={
             "node_id": "worker-a",
             "success": True,
@@ -432,7 +489,7 @@ def test_tasks_pull_submit_and_job_completion(client: TestClient) -> None:
 
     pull_two = client.post(
         "/v1/tasks/pull",
-        headers=_agent_headers(),
+        headers=_AGENT_HEADERS,
         json={"node_id": "worker-a"},
     )
     assert pull_two.status_code == 200
@@ -441,7 +498,7 @@ def test_tasks_pull_submit_and_job_completion(client: TestClient) -> None:
 
     result_two = client.post(
         f"/v1/tasks/{task_two['id']}/result",
-        headers=_agent_headers(),
+        headers=_AGENT_HEADERS,
         json={
             "node_id": "worker-a",
             "success": True,
@@ -487,7 +544,7 @@ def test_task_retry_and_reassignment(
 
     first_pull = client.post(
         "/v1/tasks/pull",
-        headers=_agent_headers(),
+        headers=_AGENT_HEADERS,
         json={"node_id": "worker-1"},
     )
     assert first_pull.status_code == 200
@@ -500,7 +557,7 @@ def test_task_retry_and_reassignment(
 
     second_pull = client.post(
         "/v1/tasks/pull",
-        headers=_agent_headers(),
+        headers=_AGENT_HEADERS,
         json={"node_id": "worker-2"},
     )
     assert second_pull.status_code == 200
@@ -511,7 +568,7 @@ def test_task_retry_and_reassignment(
 
     failed_result = client.post(
         f"/v1/tasks/{reassigned['id']}/result",
-        headers=_agent_headers(),
+        headers=_AGENT_HEADERS,
         json={
             "node_id": "worker-2",
             "success": False,
@@ -4,41 +4,72 @@ from pydantic import ValidationError
 from models import Job, NodePolicy, RolePreference, TaskType
 
 
-def test_node_policy_valid_range() -> None:
-    policy = NodePolicy(
-        enabled=True,
-        cpu_cap_percent=80,
-        gpu_cap_percent=60,
-        ram_cap_percent=70,
-        task_allowlist=[TaskType.INFERENCE, TaskType.EMBEDDINGS],
-        role_preference=RolePreference.PREFER_INFERENCE,
-    )
+@pytest.mark.parametrize(
+    ("kwargs", "expected_cpu_cap", "expected_gpu_cap", "expected_role"),
+    [
+        pytest.param(
+            {
+                "cpu_cap_percent": 80,
+                "gpu_cap_percent": 60,
+                "ram_cap_percent": 70,
+                "task_allowlist": [TaskType.INFERENCE, TaskType.EMBEDDINGS],
+                "role_preference": RolePreference.PREFER_INFERENCE,
+            },
+            80,
+            60,
+            RolePreference.PREFER_INFERENCE,
+            id="valid-range",
+        ),
+        pytest.param(
+            {
+                "cpu_cap_percent": 100,
+                "ram_cap_percent": 100,
+                "task_allowlist": [TaskType.PREPROCESS],
+            },
+            100,
+            None,
+            RolePreference.AUTO,
+            id="defaults-role-preference",
+        ),
+    ],
+)
+def test_node_policy_accepts_valid(
+    kwargs: dict[str, object],
+    expected_cpu_cap: int,
+    expected_gpu_cap: int | None,
+    expected_role: RolePreference,
+) -> None:
+    policy = NodePolicy(enabled=True, **kwargs)
 
-    assert policy.cpu_cap_percent == 80
-    assert policy.gpu_cap_percent == 60
-    assert policy.role_preference == RolePreference.PREFER_INFERENCE
+    assert policy.cpu_cap_percent == expected_cpu_cap
+    assert policy.gpu_cap_percent == expected_gpu_cap
+    assert policy.role_preference == expected_role
 
 
-def test_node_policy_rejects_out_of_range_cpu_cap() -> None:
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param(
+            {
+                "cpu_cap_percent": 101,
+                "ram_cap_percent": 50,
+                "task_allowlist": [TaskType.INFERENCE],
+                "role_preference": RolePreference.AUTO,
+            },
+            id="out-of-range-cpu-cap",
+        ),
+        pytest.param({"cpu_cap_percent": -1}, id="negative-cpu-cap"),
+        pytest.param({"gpu_cap_percent": 101}, id="out-of-range-gpu-cap"),
+        pytest.param({"gpu_cap_percent": -5}, id="negative-gpu-cap"),
+        pytest.param({"ram_cap_percent": 101}, id="out-of-range-ram-cap"),
+        pytest.param({"ram_cap_percent": -5}, id="negative-ram-cap"),
+        pytest.param({"task_allowlist": ["NOT_A_TASK"]}, id="unknown-task-type"),
+        pytest.param({"role_preference": "LEADER"}, id="unknown-role-preference"),
+    ],
+)
+def test_node_policy_rejects_invalid(kwargs: dict[str, object]) -> None:
     with pytest.raises(ValidationError):
-        NodePolicy(
-            enabled=True,
-            cpu_cap_percent=101,
-            ram_cap_percent=50,
-            task_allowlist=[TaskType.INFERENCE],
-            role_preference=RolePreference.AUTO,
-        )
-
-
-def test_node_policy_defaults_role_preference() -> None:
-    policy = NodePolicy(
-        enabled=True,
-        cpu_cap_percent=100,
-        ram_cap_percent=100,
-        task_allowlist=[TaskType.PREPROCESS],
-    )
-
-    assert policy.role_preference == RolePreference.AUTO
+        NodePolicy(enabled=True, **kwargs)
 
 
 def test_job_model_validation() -> None:
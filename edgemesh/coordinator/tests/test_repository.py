@@ -1,5 +1,10 @@
+import sqlite3
 from datetime import datetime, timedelta, timezone
 
+import pytest
+from pydantic import ValidationError
+from sqlalchemy.exc import OperationalError
+
 from db.repository import CoordinatorRepository
 from models import (
     Job,
@@ -13,10 +18,11 @@ from models import (
     TaskType,
 )
 
+MEMORY_DB_URL = "sqlite:///:memory:"
 
-def test_repository_node_crud(tmp_path) -> None:
-    db_path = tmp_path / "repo-test.db"
-    repo = CoordinatorRepository(f"sqlite:///{db_path}")
+
+def test_repository_node_crud() -> None:
+    repo = CoordinatorRepository(MEMORY_DB_URL)
 
     repo.upsert_node_identity(
         node_id="node-1",
@@ -79,9 +85,8 @@ def test_repository_node_crud(tmp_path) -> None:
     repo.close()
 
 
-def test_repository_job_crud_and_transitions(tmp_path) -> None:
-    db_path = tmp_path / "job-test.db"
-    repo = CoordinatorRepository(f"sqlite:///{db_path}")
+def test_repository_job_crud_and_transitions() -> None:
+    repo = CoordinatorRepository(MEMORY_DB_URL)
 
     created = repo.create_job(
         Job(
@@ -113,13 +118,197 @@ def test_repository_job_crud_and_transitions(tmp_path) -> None:
     rows = repo.list_jobs(status=JobStatus.COMPLETED)
     assert len(rows) == 1
     assert rows[0].id == "job-1"
+    assert repo.count_jobs(status=JobStatus.COMPLETED) == 1
+    assert repo.count_jobs(status=JobStatus.QUEUED) == 0
+    assert repo.count_jobs(node_id="node-missing") == 0
+
+    repo.close()
+
+
+def test_repository_create_jobs_bulk() -> None:
+    repo = CoordinatorRepository(MEMORY_DB_URL)
+
+    created = repo.create_jobs_bulk(
+        [
+            Job(id="job-a", type=TaskType.EMBEDDINGS, assigned_node_id="node-1"),
+            Job(id="job-b", type=TaskType.EMBEDDINGS),
+        ],
+        [[{"task_index": 0}, {"task_index": 1}], [{"task_index": 0}]],
+    )
+
+    assert [job.total_tasks for job in created] == [2, 1]
+
+    fetched = repo.get_job("job-a")
+    assert fetched is not None
+    assert fetched.assigned_node_id == "node-1"
+    assert fetched.total_tasks == 2
+    assert fetched.queued_tasks == 2
+    assert len(repo.list_tasks(job_id="job-b")) == 1
+
+    repo.close()
+
+
+def test_repository_register_node() -> None:
+    repo = CoordinatorRepository(MEMORY_DB_URL)
+
+    node = repo.register_node(
+        node_id="node-1",
+        display_name="Node One",
+        ip="10.0.0.5",
+        port=7001,
+        capabilities=NodeCapabilities(task_types=[TaskType.INFERENCE], cpu_threads=4),
+    )
+    assert node.identity.display_name == "Node One"
+    assert node.capabilities.task_types == [TaskType.INFERENCE]
+
+    node = repo.register_node("node-1", "Renamed", "10.0.0.6", 7002, {})
+    assert node.identity.display_name == "Renamed"
+    assert node.identity.port == 7002
+    assert node.capabilities.task_types == []
+    assert len(repo.get_nodes()) == 1
+
+    repo.close()
+
+
+def test_repository_shares_read_only_node_documents() -> None:
+    repo = CoordinatorRepository(MEMORY_DB_URL)
+    repo.update_node_policy("node-1", NodePolicy(cpu_cap_percent=50))
+
+    first = repo.get_node("node-1")
+    second = repo.get_node("node-1")
+    assert first is not None and second is not None
+    assert first.policy is second.policy
+    with pytest.raises(ValidationError):
+        first.policy.enabled = False
+    with pytest.raises(ValidationError):
+        first.capabilities.has_gpu = True
+
+    repo.update_node_policy("node-1", NodePolicy(enabled=False))
+    node = repo.get_node("node-1")
+    assert node is not None
+    assert node.policy.enabled is False and node.policy.cpu_cap_percent == 100
+
+    repo.close()
+
+
+def test_repository_list_eligible_nodes() -> None:
+    repo = CoordinatorRepository(MEMORY_DB_URL)
+
+    for node_id, cpu_percent in (("idle", 10), ("busy", 95), ("disabled", 5)):
+        repo.register_node(node_id, node_id, "10.0.0.5", 7001, {})
+        repo.update_node_metrics(node_id, NodeMetrics(cpu_percent=cpu_percent))
+    repo.update_node_policy("busy", NodePolicy(cpu_cap_percent=80))
+    repo.update_node_policy("disabled", NodePolicy(enabled=False))
+    repo.queue_node_metrics("idle", NodeMetrics(cpu_percent=20))
+
+    eligible = repo.list_eligible_nodes(TaskType.EMBEDDINGS)
+    assert [node.identity.node_id for node in eligible] == ["idle"]
+    assert eligible[0].metrics.cpu_percent == 20
+    assert repo.list_eligible_nodes(TaskType.INFERENCE) == []
 
     repo.close()
 
 
-def test_repository_task_lifecycle_and_metrics(tmp_path) -> None:
-    db_path = tmp_path / "task-test.db"
+def test_repository_coalesces_queued_heartbeats(tmp_path) -> None:
+    db_path = tmp_path / "heartbeat-test.db"
     repo = CoordinatorRepository(f"sqlite:///{db_path}")
+    repo.upsert_node_identity("node-1", "Node One", "10.0.0.5", 7001)
+
+    repo.queue_node_metrics("node-1", NodeMetrics(cpu_percent=10))
+    repo.queue_node_metrics("node-1", NodeMetrics(cpu_percent=20))
+    repo.queue_node_metrics("node-2", NodeMetrics(cpu_percent=30))
+
+    pending = repo.get_node("node-1")
+    assert pending is not None
+    assert pending.metrics.cpu_percent == 20
+    assert pending.status == NodeStatus.ONLINE
+
+    assert repo.flush_node_metrics() == 2
+    assert repo.flush_node_metrics() == 0
+
+    reopened = CoordinatorRepository(f"sqlite:///{db_path}")
+    flushed = reopened.get_node("node-1")
+    assert flushed is not None
+    assert flushed.metrics.cpu_percent == 20
+    assert flushed.status == NodeStatus.ONLINE
+    assert reopened.get_node("node-2") is not None
+
+    reopened.close()
+    repo.close()
+
+
+def test_repository_keeps_heartbeats_queued_when_flush_fails(monkeypatch) -> None:
+    repo = CoordinatorRepository(MEMORY_DB_URL)
+    repo.queue_node_metrics("node-1", NodeMetrics(cpu_percent=10))
+    repo.queue_node_metrics("node-2", NodeMetrics(cpu_percent=20))
+
+    session_factory = repo._session_factory
+
+    class LockedSessionFactory:
+        def begin(self):
+            # A newer sample lands while the failing flush is in flight.
+            repo.queue_node_metrics("node-2", NodeMetrics(cpu_percent=25))
+            raise OperationalError(
+                "INSERT", {}, sqlite3.OperationalError("database is locked")
+            )
+
+    monkeypatch.setattr(repo, "_session_factory", LockedSessionFactory())
+    with pytest.raises(OperationalError):
+        repo.flush_node_metrics()
+
+    monkeypatch.setattr(repo, "_session_factory", session_factory)
+    assert repo.flush_node_metrics() == 2
+
+    node_1 = repo.get_node("node-1")
+    node_2 = repo.get_node("node-2")
+    assert node_1 is not None and node_1.metrics.cpu_percent == 10
+    assert node_2 is not None and node_2.metrics.cpu_percent == 25
+
+    repo.close()
+
+
+def test_repository_reads_queued_heartbeat_while_flush_in_flight(
+    monkeypatch,
+) -> None:
+    repo = CoordinatorRepository(MEMORY_DB_URL)
+    repo.queue_node_metrics("node-1", NodeMetrics(cpu_percent=5))
+    repo.flush_node_metrics()
+    repo.queue_node_metrics("node-1", NodeMetrics(cpu_percent=10))
+
+    session_factory = repo._session_factory
+    seen_during_flush: list[float] = []
+
+    class InFlightSessionFactory:
+        def __call__(self):
+            return session_factory()
+
+        def begin(self):
+            node = repo.get_node("node-1")
+            assert node is not None
+            seen_during_flush.append(node.metrics.cpu_percent)
+            # A newer sample lands before the in-flight batch commits.
+            repo.queue_node_metrics("node-1", NodeMetrics(cpu_percent=30))
+            return session_factory.begin()
+
+    monkeypatch.setattr(repo, "_session_factory", InFlightSessionFactory())
+    assert repo.flush_node_metrics() == 1
+    monkeypatch.setattr(repo, "_session_factory", session_factory)
+
+    assert seen_during_flush == [10]
+    node = repo.get_node("node-1")
+    assert node is not None and node.metrics.cpu_percent == 30
+
+    # The newer sample stayed queued and is what the next flush persists.
+    assert repo.flush_node_metrics() == 1
+    assert repo.flush_node_metrics() == 0
+    node = repo.get_node("node-1")
+    assert node is not None and node.metrics.cpu_percent == 30
+
+    repo.close()
+
+
+def test_repository_task_lifecycle_and_metrics() -> None:
+    repo = CoordinatorRepository(MEMORY_DB_URL)
 
     repo.upsert_node_identity(
         node_id="worker-1",
@@ -8,17 +8,22 @@ from models import (
     RolePreference,
     TaskType,
 )
-from scheduler import compute_effective_capacity, is_node_eligible, score_node
+from scheduler import (
+    compute_effective_capacity,
+    is_node_eligible,
+    score_node,
+    score_nodes_batch,
+)
 
 
-def _build_node(
-    has_gpu: bool = True, role_preference: RolePreference = RolePreference.AUTO
-) -> Node:
-    return Node(
-        identity=NodeIdentity(
+def _new_node(has_gpu: bool) -> Node:
+    # Known-valid literals; model_construct skips validation, so fields the
+    # NodeCapabilities validator would normalize (ram_gb) are set explicitly.
+    return Node.model_construct(
+        identity=NodeIdentity.model_construct(
             node_id="n1", display_name="Node 1", ip="127.0.0.1", port=9100
         ),
-        capabilities=NodeCapabilities(
+        capabilities=NodeCapabilities.model_construct(
             task_types=[
                 TaskType.INFERENCE,
                 TaskType.EMBEDDINGS,
@@ -30,12 +35,13 @@ def _build_node(
             cpu_cores=8,
             cpu_threads=16,
             ram_total_gb=32,
+            ram_gb=32,
             vram_total_gb=24 if has_gpu else None,
             gpu_name="NVIDIA" if has_gpu else None,
             os="linux",
             arch="x86_64",
         ),
-        metrics=NodeMetrics(
+        metrics=NodeMetrics.model_construct(
             cpu_percent=20,
             ram_used_gb=10,
             ram_percent=30,
@@ -43,7 +49,7 @@ def _build_node(
             vram_used_gb=5 if has_gpu else None,
             running_jobs=1,
         ),
-        policy=NodePolicy(
+        policy=NodePolicy.model_construct(
             enabled=True,
             cpu_cap_percent=50,
             gpu_cap_percent=75,
@@ -54,12 +60,29 @@ def _build_node(
                 TaskType.INDEX,
                 TaskType.TOKENIZE,
             ],
-            role_preference=role_preference,
         ),
         status=NodeStatus.ONLINE,
     )
 
 
+_NODE_TEMPLATES = {has_gpu: _new_node(has_gpu) for has_gpu in (True, False)}
+
+
+def _build_node(
+    has_gpu: bool = True, role_preference: RolePreference = RolePreference.AUTO
+) -> Node:
+    # Shallow copy: nested models are shared with the template, so tests
+    # replace them via model_copy rather than mutating in place.
+    template = _NODE_TEMPLATES[has_gpu]
+    return template.model_copy(
+        update={
+            "policy": template.policy.model_copy(
+                update={"role_preference": role_preference}
+            )
+        }
+    )
+
+
 def test_compute_effective_capacity() -> None:
     node = _build_node()
 
@@ -78,7 +101,9 @@ def test_is_node_eligible() -> None:
 
 def test_is_node_ineligible_when_cpu_over_cap() -> None:
     node = _build_node()
-    node.metrics.cpu_percent = 60
+    node = node.model_copy(
+        update={"metrics": node.metrics.model_copy(update={"cpu_percent": 60})}
+    )
 
     assert is_node_eligible(node, TaskType.INFERENCE) is False
 
@@ -107,3 +132,15 @@ def test_embed_scoring_prefers_cpu_nodes_with_cpu_role() -> None:
     assert score_node(cpu_node, TaskType.EMBEDDINGS) > score_node(
         gpu_node, TaskType.EMBEDDINGS
     )
+
+
+def test_score_nodes_batch_matches_score_node() -> None:
+    nodes = [
+        _build_node(has_gpu=True, role_preference=RolePreference.PREFER_INFERENCE),
+        _build_node(has_gpu=False, role_preference=RolePreference.PREFER_EMBEDDINGS),
+    ]
+
+    for task_type in TaskType:
+        assert score_nodes_batch(nodes, task_type) == [
+            score_node(node, task_type) for node in nodes
+        ]
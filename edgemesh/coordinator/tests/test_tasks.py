@@ -0,0 +1,29 @@
+import asyncio
+
+import pytest
+
+from api import tasks
+
+
+def test_heartbeat_flusher_survives_flush_failure(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    outcomes = [RuntimeError("database is locked"), 3]
+
+    def flush_node_metrics() -> int:
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(tasks, "flush_node_metrics", flush_node_metrics)
+
+    async def run_until_drained() -> None:
+        flusher = asyncio.create_task(tasks.heartbeat_flusher(0))
+        while outcomes and not flusher.done():
+            await asyncio.sleep(0)
+        assert not flusher.done()
+        flusher.cancel()
+
+    asyncio.run(run_until_drained())
+    assert outcomes == []